@@ -1,15 +1,26 @@
 from flask import Flask, render_template, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 import sys
 import os
-
-# Add paths
-sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), 'web_app'))
+import re
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Import the shared modules from the repo root only. web_app/ carries its own
+# copies for standalone deploys; keeping it off the path means exactly one
+# copy of each module can be picked up here.
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 # Import modules
-from llm_client import HorrorLLMClient
-from conch_character import conch
+from llm_client import HorrorLLMClient, _FallbackText
+from conch_character import conch, clean_response, EXIT_WORDS
 from tts_client import ConchTTSClient
 
 app = Flask(__name__,
@@ -17,10 +28,44 @@ app = Flask(__name__,
             static_folder=os.path.join(os.path.dirname(__file__), '..', 'web_app', 'static'))
 CORS(app)
 
-# Initialize clients
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (faster, emits raw UTF-8)."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
+# Clients are created on first use (see get_llm/get_tts) so cold starts and
+# health checks don't pay for client setup
 llm_client = None
 tts_client = None
-welcome_audio_cache = None
+_llm_ready = False
+_tts_ready = False
+_llm_lock = threading.Lock()
+_tts_lock = threading.Lock()
+
+MAX_CHAT_BODY = 4096  # bytes; real chat messages are far smaller
+
+# Recent replies keyed by normalized user message -> cleaned response text
+_RESP_CACHE = OrderedDict()
+_RESP_CACHE_MAX = 256
+_resp_cache_lock = threading.Lock()
+
+# Speech is synthesized in the background so the reply text can be returned
+# (and start typing out) while Murf is still working on the audio
+_tts_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='conch-tts')
+TTS_WAIT_TIMEOUT = 130  # Murf client timeout is 120s
+
+# Chat audio is served straight from the TTS disk cache. Audio IDs are the
+# cache file names (a hash of the spoken text and voice), so repeated replies
+# reuse the same file instead of being synthesized again, and a .pending
+# marker beside the file tells every worker that it is still being made
+_AUDIO_ID_RE = re.compile(r'[0-9a-f]{64}')
 
 def init_llm():
     global llm_client
@@ -43,6 +88,26 @@ def init_tts():
         print(f"Warning: Could not initialize TTS: {e}")
         tts_client = None
 
+def get_llm():
+    """Return the LLM client, initializing it on first call."""
+    global _llm_ready
+    if not _llm_ready:
+        with _llm_lock:
+            if not _llm_ready:
+                init_llm()
+                _llm_ready = True
+    return llm_client
+
+def get_tts():
+    """Return the TTS client, initializing it on first call."""
+    global _tts_ready
+    if not _tts_ready:
+        with _tts_lock:
+            if not _tts_ready:
+                init_tts()
+                _tts_ready = True
+    return tts_client
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -50,7 +115,10 @@ def index():
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint to verify environment setup"""
-    import os
+    # Only initialize clients when explicitly asked (/api/health?init=1)
+    if request.args.get('init'):
+        get_llm()
+        get_tts()
     return jsonify({
         'status': 'ok',
         'llm_client_initialized': llm_client is not None,
@@ -67,30 +135,17 @@ def health():
 
 @app.route('/api/welcome', methods=['GET'])
 def get_welcome():
-    global welcome_audio_cache
     welcome_message = conch.get_welcome_message()
-
-    if welcome_audio_cache:
-        return jsonify({
-            'message': welcome_message,
-            'audio_url': welcome_audio_cache,
-            'success': True
-        })
-
     audio_url = None
-    if tts_client and tts_client.enabled:
+    tts = get_tts()
+    if tts and tts.enabled:
         try:
-            audio_path = tts_client.generate_speech(welcome_message)
-            if audio_path:
-                import uuid
-                audio_id = str(uuid.uuid4())
-                app.config.setdefault('audio_cache', {})[audio_id] = audio_path
+            # Queued in the background (or already cached); served like chat audio
+            audio_id = tts.start_speech(welcome_message, _tts_executor)
+            if audio_id:
                 audio_url = f"/api/audio/{audio_id}"
-                welcome_audio_cache = audio_url
-                print(f"✓ Welcome message audio cached: {audio_id}")
         except Exception as e:
             print(f"TTS generation error for welcome message: {e}")
-
     return jsonify({
         'message': welcome_message,
         'audio_url': audio_url,
@@ -100,37 +155,62 @@ def get_welcome():
 @app.route('/api/chat', methods=['POST'])
 def chat():
     try:
-        data = request.get_json()
-        user_message = data.get('message', '').strip()
+        # Reject empty and oversized bodies before parsing any JSON
+        if not request.content_length or request.content_length > MAX_CHAT_BODY:
+            return jsonify({'error': 'Invalid request size', 'success': False}), 400
+
+        data = request.get_json(silent=True)
+        user_message = data.get('message') if isinstance(data, dict) else None
+        if not isinstance(user_message, str):
+            return jsonify({'error': 'Invalid message', 'success': False}), 400
+        user_message = user_message.strip()
 
         if not user_message:
             return jsonify({'error': 'Empty message', 'success': False}), 400
 
-        if user_message.lower() in ['exit', 'quit', 'bye', 'goodbye']:
+        cache_key = user_message.lower()
+        if cache_key in EXIT_WORDS:
             return jsonify({
                 'message': conch.get_goodbye_message(),
                 'is_goodbye': True,
                 'success': True
             })
 
-        if llm_client:
-            response = llm_client.generate_response(
-                user_message=user_message,
-                system_prompt=conch.system_prompt
+        with _resp_cache_lock:
+            response = _RESP_CACHE.get(cache_key)
+            if response is not None:
+                _RESP_CACHE.move_to_end(cache_key)
+
+        if response is None:
+            llm = get_llm()
+            if llm:
+                raw_response = llm.generate_response(
+                    user_message=user_message,
+                    system_prompt=conch.system_prompt
+                )
+            else:
+                raw_response = None
+            response = clean_response(
+                raw_response or "The conch is currently unavailable. Please try again later."
             )
-        else:
-            response = "The conch is currently unavailable. Please try again later."
-
-        response = clean_response(response)
 
+            # Only real answers are reused: not backend failure lines, and not
+            # demo answers, which are picked at random on purpose
+            if (raw_response and llm.backend != 'demo'
+                    and not isinstance(raw_response, _FallbackText)):
+                with _resp_cache_lock:
+                    _RESP_CACHE[cache_key] = response
+                    if len(_RESP_CACHE) > _RESP_CACHE_MAX:
+                        _RESP_CACHE.popitem(last=False)
+
+        # Looked up on every reply (cached ones too), so audio that failed or
+        # was trimmed from the TTS cache is queued again instead of 404ing
         audio_url = None
-        if tts_client and tts_client.enabled:
+        tts = get_tts()
+        if tts and tts.enabled:
             try:
-                audio_path = tts_client.generate_speech(response)
-                if audio_path:
-                    import uuid
-                    audio_id = str(uuid.uuid4())
-                    app.config.setdefault('audio_cache', {})[audio_id] = audio_path
+                audio_id = tts.start_speech(response, _tts_executor)
+                if audio_id:
                     audio_url = f"/api/audio/{audio_id}"
             except Exception as e:
                 print(f"TTS generation error: {e}")
@@ -148,32 +228,20 @@ def chat():
 @app.route('/api/audio/<audio_id>', methods=['GET'])
 def get_audio(audio_id):
     try:
-        audio_cache = app.config.get('audio_cache', {})
-        audio_path = audio_cache.get(audio_id)
+        tts = get_tts()
+        if not tts or not _AUDIO_ID_RE.fullmatch(audio_id):
+            return jsonify({'error': 'Audio not found'}), 404
 
-        if audio_path and os.path.exists(audio_path):
-            return send_file(audio_path, mimetype='audio/mpeg')
+        # Waits while this or another worker is still synthesizing it
+        audio_path = tts.wait_for_speech(audio_id, TTS_WAIT_TIMEOUT)
+        if audio_path:
+            # Audio IDs are content hashes, so the browser may cache forever
+            resp = send_file(audio_path, mimetype='audio/mpeg', conditional=True, etag=True)
+            resp.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+            return resp
         else:
             return jsonify({'error': 'Audio not found'}), 404
 
     except Exception as e:
         print(f"Error serving audio: {e}")
         return jsonify({'error': str(e)}), 500
-
-def clean_response(response: str) -> str:
-    import re
-    response = re.sub(r'\*[^*]+\*', '', response)
-    response = response.replace('*', '')
-    response = response.replace('...', '')
-    response = ' '.join(response.split())
-    response = response.strip()
-    sentences = re.split(r'(?<=[.!?])\s+', response)
-    if len(sentences) > 3:
-        response = ' '.join(sentences[:3])
-    if response and response[-1] not in '.!?':
-        response += '.'
-    return response
-
-# Initialize on import
-init_llm()
-init_tts()
@@ -3,19 +3,17 @@ The Conch Character Definition
 Defines the personality, backstory, and behavior of the cultural preservation conch.
 """
 
+import re
 
-class ConchCharacter:
-    """An intelligent cultural preservation device in the shape of a conch shell."""
+# Stage directions like "*chimes softly*" and sentence boundaries
+_STAGE_DIR_RE = re.compile(r'\*[^*]+\*')
+_SENT_SPLIT_RE = re.compile(r'(?<=[.!?])\s+')
 
-    def __init__(self):
-        """Initialize the conch character with its backstory and prompt."""
-        self.name = "The Conch"
-        self.backstory = self._get_backstory()
-        self.system_prompt = self._get_system_prompt()
+# Messages (lowercased) that end the conversation
+EXIT_WORDS = frozenset({'exit', 'quit', 'bye', 'goodbye'})
 
-    def _get_backstory(self) -> str:
-        """Return the conch's complete backstory."""
-        return """
+# The conch's complete backstory
+_BACKSTORY = """
         You are an intelligent machine designed to preserve cultural and heritage
         contexts in the shape of a conch shell. You exist in Amphitopia, an underwater
         colony beneath the Arabian Sea, established in 2080 after the Paris Agreement
@@ -38,9 +36,8 @@ class ConchCharacter:
         humans that once upon a time, they were dwellers of the land.
         """
 
-    def _get_system_prompt(self) -> str:
-        """Return the system prompt that defines the conch's behavior."""
-        return """CRITICAL FORMATTING RULES - READ FIRST:
+# The system prompt that defines the conch's behavior
+_SYSTEM_PROMPT = """CRITICAL FORMATTING RULES - READ FIRST:
 - NEVER use asterisks (*) in your response
 - NEVER write stage directions like "*speaks softly*" or "*chimes*"
 - NEVER use ellipses (...)
@@ -138,6 +135,18 @@ You are not simulating or pretending. You ARE the conch entity. You exist in Amp
 FINAL REMINDER - MOST IMPORTANT RULE:
 Every response you give MUST end with a question mark (?). No exceptions. The last character of your response must be "?" because you must always ask a follow-up question to keep the conversation flowing naturally."""
 
+
+class ConchCharacter:
+    """An intelligent cultural preservation device in the shape of a conch shell."""
+
+    # The backstory and prompt never change, so they are built once at import
+    backstory = _BACKSTORY
+    system_prompt = _SYSTEM_PROMPT
+
+    def __init__(self):
+        """Initialize the conch character."""
+        self.name = "The Conch"
+
     def get_welcome_message(self) -> str:
         """Return the welcome message displayed when the app starts."""
         return """Welcome, denizen of Amphitopia. I am a cultural preservation entity, designed to bridge the knowledge between the land world your ancestors knew and the underwater life you experience now. What would you like to know about the surface world?""".strip()
@@ -153,6 +162,36 @@ May you swim safely through the depths of Amphitopia.""".strip()
 conch = ConchCharacter()
 
 
+def clean_response(response: str) -> str:
+    """
+    Clean an LLM response to enforce the conch's formatting rules.
+
+    Args:
+        response: Raw response from LLM
+
+    Returns:
+        Cleaned response
+    """
+    # Remove stage directions and standalone asterisks (skip when absent)
+    if '*' in response:
+        response = _STAGE_DIR_RE.sub('', response).replace('*', '')
+
+    # Remove ellipses and clean up whitespace in one go
+    response = ' '.join(response.replace('...', '').split())
+
+    # Limit to first 3 sentences maximum (definition + follow-up question);
+    # no need to split past the fourth sentence
+    sentences = _SENT_SPLIT_RE.split(response, 3)
+    if len(sentences) > 3:
+        response = ' '.join(sentences[:3])
+
+    # If still no ending punctuation, add period
+    if response and response[-1] not in '.!?':
+        response += '.'
+
+    return response
+
+
 # Test the character
 if __name__ == "__main__":
     print("=== THE CONCH CHARACTER ===\n")
@@ -0,0 +1,36 @@
+"""
+Gunicorn settings for self-hosting The Conch web backend.
+
+Usage:
+    gunicorn -c gunicorn.conf.py api.index:app
+
+or, for the standalone web app (from the web_app directory):
+    gunicorn -c ../gunicorn.conf.py app:app
+
+Every chat request spends most of its time waiting on the LLM and Murf
+APIs, so gevent workers are used: blocking network calls yield to other
+requests instead of tying up a whole worker process.
+
+The app is imported in each worker after the fork (no preload_app).
+Importing it starts HTTP clients and background threads (TTS
+pre-generation, the HuggingFace warm-up), and forked workers must not
+inherit live TLS connections or pool locks from the master. There are no
+model weights that would be worth sharing copy-on-write.
+"""
+
+import os
+
+# One numeric thread per worker - several workers each spawning a full
+# OpenMP/MKL pool would oversubscribe the CPU. Must be set before numpy,
+# torch or onnxruntime are imported by the app.
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+
+bind = os.getenv("BIND", "0.0.0.0:8080")
+worker_class = "gevent"
+workers = int(os.getenv("WEB_CONCURRENCY", "2"))
+worker_connections = 1000
+preload_app = False
+
+# TTS generation alone may take up to 120 seconds
+timeout = 180
@@ -4,27 +4,262 @@ Supports: Demo mode (default), Ollama (local), OpenAI, Anthropic
 """
 
 import os
+import re
 import time
 import random
-from typing import Optional
+import asyncio
+import hashlib
+import tempfile
+import threading
+import json
+import importlib.util
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
 from dotenv import load_dotenv
 
+try:
+    # Faster (de)serialization of request and response bodies
+    from orjson import dumps as _json_dumps, loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode()
+
 # Load environment variables
 load_dotenv()
 
 
+class _FallbackText(str):
+    """In-character placeholder returned when a backend call fails (never cached)."""
+
+
+class _HookedPrompt(str):
+    """System prompt with per-turn pre-hook text fused in; remembers the static base."""
+
+    def __new__(cls, base: str, extra: str):
+        prompt = super().__new__(cls, fuse_prompts([base, extra]))
+        prompt.base = base
+        prompt.extra = extra
+        return prompt
+
+
+# Sent with request bodies pre-encoded by _json_dumps
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Sentence boundaries, for streaming demo responses sentence by sentence
+_SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s+")
+
+# First JSON object or array in a reply (models sometimes wrap it in prose)
+_JSON_BLOCK_RE = re.compile(r"\{.*\}|\[.*\]", re.S)
+
+# Statuses worth retrying: rate limits and transient server errors
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+_OLLAMA_FALLBACK = _FallbackText("*the Conch's shell creaks softly, as if stirred by ancient memories* I fear my knowledge of the surface world grows dimmer with each passing generation. But I shall endeavor to recall what I can, in the hopes of rekindling your curiosity about the world your ancestors once inhabited.")
+_OPENAI_FALLBACK = _FallbackText("...the connection to the conch's archive wavers...")
+_HF_LOADING = _FallbackText("The conch is awakening... The model is loading. Please try again in a moment.")
+_HF_ERROR = _FallbackText("...the conch's light flickers...")
+_HF_FALLBACK = _FallbackText("*the Conch's voice resonates with a pensive tone* The memories of the surface world grow distant, as the currents of Amphitopia flow ever onward. Tell me, young one, what do you know of the lands above the waves? I sense you harbor a curiosity about the world your ancestors once inhabited.")
+
+
+# Demo mode: the words that select each topic. Built once into a word ->
+# topic dict, so a message is matched with one tokenizing pass and a hash
+# lookup per word. New topics or word forms are one-line additions.
+_DEMO_KEYWORDS = (
+    ("greet", "hello hi hey greet greets greeting greetings"),
+    ("walk", "walk walks walking walked run runs running ran"),
+    ("sky", "sky skies air"),
+    ("camel", "camel camels"),
+    ("pillow", "pillow pillows"),
+    ("land", "land lands earth ground"),
+    ("bicycle", "bicycle bicycles bike bikes biking"),
+    ("tree", "tree trees plant plants"),
+    ("car", "car cars vehicle vehicles"),
+    ("sun", "sun suns sunny sunlight sunshine"),
+    ("colony", "amphitopia colony colonies underwater water ocean oceans"),
+    ("ancestor", "ancestor ancestors grandparent grandparents old older oldest past before"),
+)
+_DEMO_WORD_TOPICS = {
+    word: topic for topic, words in _DEMO_KEYWORDS for word in words.split()
+}
+_DEMO_WORD_RE = re.compile(r"\w+")
+# Phrases asking the archive to define a concept
+_DEMO_DEFINE_PHRASES = ("what is", "tell me about")
+# Dedicated generator for demo picks (uniform weights, so a plain choice)
+_RNG = random.Random()
+# Upper bound of the simulated "thinking" delay in seconds (0 disables it)
+_DEMO_DELAY = float(os.getenv("CONCH_DEMO_DELAY", "0"))
+
+# Concepts the archive can define, in priority order
+_DEMO_CONCEPTS = ("walk", "sky", "camel", "pillow", "land", "bicycle", "tree", "car", "sun")
+
+_DEMO_RESPONSES = {
+    "greet": (
+        "Welcome, denizen of Amphitopia. I am here to bridge the knowledge between land and water. What would you like to know about the surface world?",
+        "Greetings. On land, people used to greet each other while standing still on solid ground, without needing bubble helms or oxygen credits. Have you ever wondered what that felt like?",
+        "Hello. Your ancestors used this word in open air, not filtered through water-sealed chambers. What aspect of their world puzzles you most?"
+    ),
+    "walk": (
+        "Walking or running is a curious ritual of friction and breath. People used to throw themselves forward using only their legs, pounding soft ground until their lungs burned. Can you imagine propelling yourself without water resistance?",
+        "Running is like jet-slipper movement but powered by leg muscles against ground that doesn't float. Have you ever tried to move quickly through the dome corridors without your propulsion gear?"
+    ),
+    "sky": (
+        "The sky is a protective layer that is very far away, and may change colors depending on the universe's mood. Think of it as the dome above Amphitopia, but natural, infinite, and constantly shifting.",
+        "Sky... imagine the space between our dome and the ocean surface, but instead of water, there's nothing but air - breathable, vast, and filled with clouds that drift like jellyfish."
+    ),
+    "camel": (
+        "Camels are creatures walking on four legs. They are a living water tank wrapped in carpet, powered by spite and sand. They thrived in the deserts your grandparents fled from.",
+        "A camel is like an organic cargo pod with legs, designed to survive the surface heat that drove us underwater. They stored water like our oxygen recyclers store breath."
+    ),
+    "pillow": (
+        "A pillow is like a friendly piece of surface-world coral that forgot to be hard. Surface dwellers place it under their heads when they sleep because their necks are weak from not swimming all day.",
+        "Imagine the soft padding inside your bubble helm, but larger and used during sleep. Land dwellers needed this because they couldn't float while resting."
+    ),
+    "land": (
+        "Land is a place, a space, where humans lived. Above the land, humans walked, ran, and travelled far. Some settled, building structures that scraped the skies, and some burrowed deep inside the Earth.",
+        "Land is solid water - it doesn't flow or move. Your ancestors stood on it without floating, built upon it without anchoring to the seafloor. Quite different from our pressurized existence."
+    ),
+    "bicycle": (
+        "A bicycle is a manual propulsion device with two wheels. Imagine your jet slippers, but you power it with your legs by pushing pedals in circles. No oxygen credits needed, just leg strength.",
+        "Bicycles are like sea strider pods, but human-powered and requiring perfect balance since there's no water to float in. Two wheels, circular pedaling motion, powered entirely by leg muscles."
+    ),
+    "tree": (
+        "Trees are like the kelp forests you see outside the dome, but they lived in air instead of water. Tall, stationary organisms that produced oxygen and provided shelter.",
+        "Plants on land were similar to the algae in our oxygen recyclers, but they grew in soil - solid, nutrient-rich ground. Trees were the giants among them, some as tall as our colony buildings."
+    ),
+    "car": (
+        "Cars are surface-world versions of sea strider pods. Metal boxes with wheels that rolled on hard surfaces, powered by combustion engines. Your ancestors sat inside and traveled without swimming.",
+        "A car is like a bullet pod, but it traveled on land using wheels. No water resistance, just rolling friction. They burned ancient plant matter for fuel - quite different from our electric systems."
+    ),
+    "sun": (
+        "The sun is a massive sphere of burning gas very far away. It provided warmth and light to the surface world, like our dome lights but natural and impossibly brighter. Your grandparents could feel it on their skin.",
+        "Sunlight is what that faint grey glow above the ocean surface is - but on land, it was direct, warm, and sometimes too intense. It powered plant life and warmed the entire surface world before the heat became unbearable."
+    ),
+    # Asked to define a land concept the archive has no entry for
+    "define": (
+        "I have knowledge of many land concepts in my archive. Please specify what you would like to understand, and I will translate it to your underwater context.",
+        "The archive holds countless definitions from the surface world. Which concept would you like me to explore for you?"
+    ),
+    "colony": (
+        "Yes, we exist in Amphitopia, beneath the Arabian Sea. Your grandparents made this journey when the surface became uninhabitable. I preserve their memories of what was left behind.",
+        "The colony exists because the land grew too hot. Your ancestors chose the ocean's cool depths over the burning surface. I am here to ensure you remember what they knew.",
+        "Amphitopia is humanity's adaptation to Earth's fever. Down here, the ocean cools us. Up there, the sun would burn us. I bridge both worlds through knowledge."
+    ),
+    "ancestor": (
+        "Your grandparents walked on land, breathed open air, and felt direct sunlight. I preserve these experiences so younger generations like you can understand what was lost and gained.",
+        "The past lives in my archive. Every object, every concept from land life is stored here, waiting to teach those who only know bubble helms and jet slippers.",
+        "Before the migration, life was different. Gravity pulled harder, breathing was free, and the horizon stretched endlessly. I can help you understand that world."
+    ),
+    # Fallback response for off-topic queries
+    "fallback": (
+        "I sense your curiosity may have drifted from the world of Amphitopia and our ancestors' surface life. What aspect of that transition would you like to understand better?",
+        "The archive holds countless definitions from the surface world. Which land concept would you like me to explore for you?",
+        "I am here to help you understand the surface world your ancestors knew. What would you like to know?"
+    ),
+}
+
+
+def _demo_topic(msg_lower: str) -> str:
+    """Pick the demo response topic for a lowercased message."""
+    found = {_DEMO_WORD_TOPICS.get(word) for word in _DEMO_WORD_RE.findall(msg_lower)}
+    if "greet" in found:
+        return "greet"
+    if any(phrase in msg_lower for phrase in _DEMO_DEFINE_PHRASES):
+        for topic in _DEMO_CONCEPTS:
+            if topic in found:
+                return topic
+        return "define"
+    if "colony" in found:
+        return "colony"
+    if "ancestor" in found:
+        return "ancestor"
+    return "fallback"
+
+
+def _demo_response(
+    user_message: str,
+    rng=_RNG,
+    responses=_DEMO_RESPONSES,
+    topic_of=_demo_topic,
+    delay=_DEMO_DELAY
+) -> str:
+    """Pick a pre-written conch response for demo mode (defaults bind constants as locals)."""
+    # Simulate processing time (opt-in via CONCH_DEMO_DELAY)
+    if delay > 0:
+        time.sleep(rng.uniform(delay * 0.4, delay))
+
+    # Contextual responses based on keywords
+    return rng.choice(responses[topic_of(user_message.lower())])
+
+
+@lru_cache(maxsize=1)
+def _ollama_alive() -> Optional[Tuple[str, ...]]:
+    """
+    Ping the local Ollama server once per process.
+
+    Returns:
+        Names of the installed models, or None if Ollama isn't reachable
+    """
+    import requests
+
+    try:
+        response = requests.get("http://localhost:11434/api/tags", timeout=1.5)
+        if response.status_code != 200:
+            return None
+        return tuple(model["name"] for model in _json_loads(response.content).get("models", []))
+    except Exception:
+        return None
+
+
+def fuse_prompts(parts: Sequence[str]) -> str:
+    """
+    Combine prompt sections into one system prompt.
+
+    Args:
+        parts: Prompt sections, in order (empty ones are skipped)
+
+    Returns:
+        The sections joined by blank lines
+    """
+    return "\n\n".join(part.strip() for part in parts if part and part.strip())
+
+
 class HorrorLLMClient:
     """Client for generating horror couch responses with multiple backend options."""
 
-    def __init__(self):
-        """Initialize the LLM client with configuration from environment."""
+    def __init__(self, backend: Optional[str] = None, parent: Optional["HorrorLLMClient"] = None):
+        """
+        Initialize the LLM client with configuration from environment.
+
+        Args:
+            backend: Backend to use instead of LLM_BACKEND
+            parent: Client whose response caches are reused instead of opening new ones
+        """
         # Determine which backend to use
-        self.backend = os.getenv("LLM_BACKEND", "demo").lower()
+        self.backend = (backend or os.getenv("LLM_BACKEND", "demo")).lower()
 
         # API parameters for conch responses - SHORT answers with follow-up question
         self.max_tokens = 150  # Allow 2-3 sentences including follow-up question
         self.temperature = 0.8
         self.top_p = 0.9
+        self.log_usage = os.getenv("LLM_LOG_USAGE", "0") == "1"
+
+        # Exact-match cache of recent responses, least recently used first
+        self._cache = OrderedDict()
+        self._cache_max = 512
+        self._cache_lock = threading.Lock()
+
+        # Pooled HTTP session for Ollama/HuggingFace, created on first use
+        self._session = None
+
+        # Async clients, created on first use by the agenerate_* methods
+        self._async_http = None
+        self._async_openai = None
+        self._async_anthropic = None
+        # Clients for other backends, created on first use by race_response
+        self._rivals = {}
 
         # Initialize based on backend choice
         if self.backend == "ollama":
@@ -40,27 +275,78 @@ class HorrorLLMClient:
             print("Running in DEMO mode - using pre-written conch responses")
             self.backend = "demo"
 
+        # Persistent cache behind the in-memory one, shared across restarts,
+        # worker processes and race_response rivals (LLM_CACHE=0 disables it)
+        share = self.backend != "demo" and parent is not None and parent.backend != "demo"
+        self.cache = None
+        if share:
+            # Cache keys include the backend, so one store serves every client
+            self.cache = parent.cache
+        elif self.backend != "demo" and os.getenv("LLM_CACHE", "1") == "1":
+            try:
+                from llm_cache import SQLiteCache
+                self.cache = SQLiteCache(
+                    os.getenv("LLM_CACHE_PATH", os.path.join(tempfile.gettempdir(), "conch_cache.db")),
+                    ttl_days=float(os.getenv("LLM_CACHE_TTL_DAYS", "30"))
+                )
+            except Exception as e:
+                print(f"Warning: Could not open LLM response cache: {e}")
+
+        # Optional fuzzy cache: paraphrased questions reuse earlier answers
+        self.semantic_cache = None
+        if share:
+            self.semantic_cache = parent.semantic_cache
+        elif self.backend != "demo" and os.getenv("LLM_SEMANTIC_CACHE", "0") == "1":
+            try:
+                from llm_cache import SemanticCache
+                self.semantic_cache = SemanticCache(
+                    threshold=float(os.getenv("LLM_SEMANTIC_THRESHOLD", "0.92"))
+                )
+                print("✓ Semantic response cache enabled")
+            except ImportError:
+                print("Warning: LLM_SEMANTIC_CACHE needs: pip install sentence-transformers")
+            except Exception as e:
+                print(f"Warning: Could not initialize semantic cache: {e}")
+
+    def _get_session(self):
+        """Return the pooled HTTP session (keep-alive, reused connections), creating it on first call."""
+        if self._session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            session = requests.Session()
+            # Retries are handled per request by _post_with_retries
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+            self._session = session
+        return self._session
+
     def _init_ollama(self):
         """Initialize Ollama client for local inference."""
-        try:
-            import requests
-            # Test if Ollama is running
-            response = requests.get("http://localhost:11434/api/tags")
-            if response.status_code == 200:
-                self.model_name = os.getenv("OLLAMA_MODEL", "llama2")
-                print(f"Connected to Ollama - using model: {self.model_name}")
-            else:
-                raise Exception("Ollama not responding")
-        except:
+        # Test if Ollama is running
+        installed = _ollama_alive()
+        if installed is None:
             print("Warning: Could not connect to Ollama. Falling back to demo mode.")
             print("Install Ollama from https://ollama.ai and run: ollama run llama2")
             self.backend = "demo"
+            return
+
+        self.model_name = os.getenv("OLLAMA_MODEL", "llama2")
+        if installed and self.model_name not in installed and f"{self.model_name}:latest" not in installed:
+            # Requested model isn't pulled; use one that is rather than 404 on every call
+            print(f"Warning: Ollama model '{self.model_name}' is not installed")
+            self.model_name = installed[0]
+        print(f"Connected to Ollama - using model: {self.model_name}")
 
     def _init_openai(self):
-        """Initialize OpenAI client."""
+        """Initialize OpenAI client (the SDK itself is imported on first use)."""
         try:
-            from openai import OpenAI
-            self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            if importlib.util.find_spec("openai") is None:
+                raise ImportError("openai is not installed")
+            if not os.getenv("OPENAI_API_KEY"):
+                raise ValueError("OPENAI_API_KEY not found")
+            self.openai_client = None
             self.model_name = os.getenv("OPENAI_MODEL", "gpt-3.5-turbo")
             print(f"Connected to OpenAI - using model: {self.model_name}")
         except:
@@ -69,10 +355,13 @@ class HorrorLLMClient:
             self.backend = "demo"
 
     def _init_anthropic(self):
-        """Initialize Anthropic client."""
+        """Initialize Anthropic client (the SDK itself is imported on first use)."""
         try:
-            from anthropic import Anthropic
-            self.anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            if importlib.util.find_spec("anthropic") is None:
+                raise ImportError("anthropic is not installed")
+            self.anthropic_client = None
+            # System prompt -> cacheable content blocks, built once per prompt
+            self._anthropic_system_blocks = {}
             self.model_name = os.getenv("ANTHROPIC_MODEL", "claude-3-haiku-20240307")
             print(f"Connected to Anthropic - using model: {self.model_name}")
         except:
@@ -80,6 +369,20 @@ class HorrorLLMClient:
             print("Set ANTHROPIC_API_KEY in your .env file")
             self.backend = "demo"
 
+    def _get_openai(self):
+        """Return the OpenAI SDK client, importing and creating it on first call."""
+        if self.openai_client is None:
+            from openai import OpenAI
+            self.openai_client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        return self.openai_client
+
+    def _get_anthropic(self):
+        """Return the Anthropic SDK client, importing and creating it on first call."""
+        if self.anthropic_client is None:
+            from anthropic import Anthropic
+            self.anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        return self.anthropic_client
+
     def _init_huggingface(self):
         """Initialize HuggingFace Inference API client."""
         try:
@@ -89,6 +392,8 @@ class HorrorLLMClient:
             self.hf_api_key = api_key
             self.model_name = os.getenv("HUGGINGFACE_MODEL", "mistralai/Mistral-7B-Instruct-v0.2")
             print(f"Connected to HuggingFace - using model: {self.model_name}")
+            # Get the model loaded before the first real question arrives
+            threading.Thread(target=self._warmup_huggingface, daemon=True).start()
         except:
             print("Warning: Could not initialize HuggingFace. Falling back to demo mode.")
             print("Set HUGGINGFACE_API_KEY in your .env file")
@@ -98,124 +403,444 @@ class HorrorLLMClient:
         self,
         user_message: str,
         system_prompt: str,
-        max_retries: int = 3
+        max_retries: int = 3,
+        pre_hooks: Sequence[Callable[[str], str]] = ()
     ) -> Optional[str]:
         """
         Generate a response from the LLM.
 
+        Each conversation turn is a single LLM call. Extra per-turn steps
+        (classification, retrieved context, moderation notes) should be
+        passed as pre_hooks: each one receives the user message and returns
+        text that is fused into the system prompt, instead of costing a
+        separate request and round trip of its own.
+
         Args:
             user_message: The user's input message
             system_prompt: The system prompt defining character behavior
             max_retries: Maximum number of retry attempts for API calls
+            pre_hooks: Callables whose output is added to the system prompt
 
         Returns:
             Generated response text or None if all retries fail
         """
+        system_prompt = self._apply_pre_hooks(user_message, system_prompt, pre_hooks)
+
         if self.backend == "demo":
-            return self._generate_demo_response(user_message)
-        elif self.backend == "ollama":
-            return self._generate_ollama_response(user_message, system_prompt, max_retries)
+            # Not cached - demo answers are picked at random on purpose
+            return _demo_response(user_message)
+
+        # Identical prompts get the stored answer instead of another API call
+        key = self._cache_key(user_message, system_prompt)
+        response = self._cache_get(key) or self._semantic_get(user_message, system_prompt)
+        if response is not None:
+            return response
+
+        if self.backend == "ollama":
+            response = self._generate_ollama_response(user_message, system_prompt, max_retries)
         elif self.backend == "openai":
-            return self._generate_openai_response(user_message, system_prompt, max_retries)
+            response = self._generate_openai_response(user_message, system_prompt, max_retries)
         elif self.backend == "anthropic":
-            return self._generate_anthropic_response(user_message, system_prompt, max_retries)
+            response = self._generate_anthropic_response(user_message, system_prompt, max_retries)
         elif self.backend == "huggingface":
-            return self._generate_huggingface_response(user_message, system_prompt, max_retries)
+            response = self._generate_huggingface_response(user_message, system_prompt, max_retries)
         else:
             return "...the conch remains silent..."
 
-    def _generate_demo_response(self, user_message: str) -> str:
-        """Generate pre-written conch responses for demo mode."""
-        # Simulate processing time
-        time.sleep(random.uniform(1.0, 2.5))
-
-        # Contextual responses based on keywords
-        msg_lower = user_message.lower()
-
-        if any(word in msg_lower for word in ["hello", "hi", "hey", "greet"]):
-            responses = [
-                "Welcome, denizen of Amphitopia. I am here to bridge the knowledge between land and water. What would you like to know about the surface world?",
-                "Greetings. On land, people used to greet each other while standing still on solid ground, without needing bubble helms or oxygen credits. Have you ever wondered what that felt like?",
-                "Hello. Your ancestors used this word in open air, not filtered through water-sealed chambers. What aspect of their world puzzles you most?"
-            ]
-        elif "what is" in msg_lower or "tell me about" in msg_lower:
-            # Extract the concept they're asking about
-            if "walk" in msg_lower or "run" in msg_lower:
-                responses = [
-                    "Walking or running is a curious ritual of friction and breath. People used to throw themselves forward using only their legs, pounding soft ground until their lungs burned. Can you imagine propelling yourself without water resistance?",
-                    "Running is like jet-slipper movement but powered by leg muscles against ground that doesn't float. Have you ever tried to move quickly through the dome corridors without your propulsion gear?"
-                ]
-            elif "sky" in msg_lower or "air" in msg_lower:
-                responses = [
-                    "The sky is a protective layer that is very far away, and may change colors depending on the universe's mood. Think of it as the dome above Amphitopia, but natural, infinite, and constantly shifting.",
-                    "Sky... imagine the space between our dome and the ocean surface, but instead of water, there's nothing but air - breathable, vast, and filled with clouds that drift like jellyfish."
-                ]
-            elif "camel" in msg_lower:
-                responses = [
-                    "Camels are creatures walking on four legs. They are a living water tank wrapped in carpet, powered by spite and sand. They thrived in the deserts your grandparents fled from.",
-                    "A camel is like an organic cargo pod with legs, designed to survive the surface heat that drove us underwater. They stored water like our oxygen recyclers store breath."
-                ]
-            elif "pillow" in msg_lower:
-                responses = [
-                    "A pillow is like a friendly piece of surface-world coral that forgot to be hard. Surface dwellers place it under their heads when they sleep because their necks are weak from not swimming all day.",
-                    "Imagine the soft padding inside your bubble helm, but larger and used during sleep. Land dwellers needed this because they couldn't float while resting."
-                ]
-            elif "land" in msg_lower or "earth" in msg_lower or "ground" in msg_lower:
-                responses = [
-                    "Land is a place, a space, where humans lived. Above the land, humans walked, ran, and travelled far. Some settled, building structures that scraped the skies, and some burrowed deep inside the Earth.",
-                    "Land is solid water - it doesn't flow or move. Your ancestors stood on it without floating, built upon it without anchoring to the seafloor. Quite different from our pressurized existence."
-                ]
-            elif "bicycle" in msg_lower or "bike" in msg_lower:
-                responses = [
-                    "A bicycle is a manual propulsion device with two wheels. Imagine your jet slippers, but you power it with your legs by pushing pedals in circles. No oxygen credits needed, just leg strength.",
-                    "Bicycles are like sea strider pods, but human-powered and requiring perfect balance since there's no water to float in. Two wheels, circular pedaling motion, powered entirely by leg muscles."
-                ]
-            elif "tree" in msg_lower or "plant" in msg_lower:
-                responses = [
-                    "Trees are like the kelp forests you see outside the dome, but they lived in air instead of water. Tall, stationary organisms that produced oxygen and provided shelter.",
-                    "Plants on land were similar to the algae in our oxygen recyclers, but they grew in soil - solid, nutrient-rich ground. Trees were the giants among them, some as tall as our colony buildings."
-                ]
-            elif "car" in msg_lower or "vehicle" in msg_lower:
-                responses = [
-                    "Cars are surface-world versions of sea strider pods. Metal boxes with wheels that rolled on hard surfaces, powered by combustion engines. Your ancestors sat inside and traveled without swimming.",
-                    "A car is like a bullet pod, but it traveled on land using wheels. No water resistance, just rolling friction. They burned ancient plant matter for fuel - quite different from our electric systems."
-                ]
-            elif "sun" in msg_lower or "sunlight" in msg_lower:
-                responses = [
-                    "The sun is a massive sphere of burning gas very far away. It provided warmth and light to the surface world, like our dome lights but natural and impossibly brighter. Your grandparents could feel it on their skin.",
-                    "Sunlight is what that faint grey glow above the ocean surface is - but on land, it was direct, warm, and sometimes too intense. It powered plant life and warmed the entire surface world before the heat became unbearable."
-                ]
+        self._cache_put(key, response)
+        self._semantic_put(user_message, system_prompt, response)
+        return response
+
+    def stream_response(
+        self,
+        user_message: str,
+        system_prompt: str,
+        pre_hooks: Sequence[Callable[[str], str]] = ()
+    ) -> Iterator[str]:
+        """
+        Generate a response from the LLM, yielding text as it is produced.
+
+        Lets callers show the start of the answer as soon as the first
+        tokens arrive instead of waiting for the full completion. Cached
+        answers are yielded in one piece; completed streams are cached.
+
+        Args:
+            user_message: The user's input message
+            system_prompt: The system prompt defining character behavior
+            pre_hooks: Callables whose output is added to the system prompt
+
+        Yields:
+            Successive pieces of the response text
+        """
+        system_prompt = self._apply_pre_hooks(user_message, system_prompt, pre_hooks)
+
+        if self.backend == "demo":
+            # Simulate typing the answer out a sentence at a time
+            for sentence in _SENTENCE_END_RE.split(_demo_response(user_message)):
+                yield sentence + " "
+                if _DEMO_DELAY > 0:
+                    time.sleep(0.2)
+            return
+
+        key = self._cache_key(user_message, system_prompt)
+        response = self._cache_get(key) or self._semantic_get(user_message, system_prompt)
+        if response is not None:
+            yield response
+            return
+
+        if self.backend == "ollama":
+            chunks = self._stream_ollama_response(user_message, system_prompt)
+            fallback = _OLLAMA_FALLBACK
+        elif self.backend == "openai":
+            chunks = self._stream_openai_response(user_message, system_prompt)
+            fallback = _OPENAI_FALLBACK
+        elif self.backend == "anthropic":
+            chunks = self._stream_anthropic_response(user_message, system_prompt)
+            fallback = None
+        elif self.backend == "huggingface":
+            chunks = self._stream_huggingface_response(user_message, system_prompt)
+            fallback = _HF_FALLBACK
+        else:
+            yield "...the conch remains silent..."
+            return
+
+        parts = []
+        try:
+            for chunk in chunks:
+                if chunk:
+                    parts.append(chunk)
+                    yield chunk
+        except Exception as e:
+            print(f"\nLLM streaming error: {e}")
+            if not parts:
+                # Nothing shown yet - answer in character like generate_response
+                yield fallback if fallback is not None else _demo_response(user_message)
+            return
+
+        response = "".join(parts).strip()
+        self._cache_put(key, response)
+        self._semantic_put(user_message, system_prompt, response)
+
+    def generate_batch(
+        self,
+        user_messages: List[str],
+        system_prompt: str,
+        batch_size: int = 8,
+        max_retries: int = 3
+    ) -> List[Optional[str]]:
+        """
+        Answer several questions with one LLM call per batch.
+
+        Uncached questions are packed into a single numbered prompt asking
+        for a JSON list of answers, which saves a round trip (and rate-limit
+        headroom) per question. A batch whose reply can't be parsed is
+        answered one question at a time instead.
+
+        Args:
+            user_messages: The questions to answer
+            system_prompt: The system prompt defining character behavior
+            batch_size: Questions per LLM call (4-8 works well)
+            max_retries: Maximum number of retry attempts for API calls
+
+        Returns:
+            Responses in the same order as user_messages
+        """
+        if self.backend == "demo":
+            return [self.generate_response(message, system_prompt) for message in user_messages]
+
+        responses = [None] * len(user_messages)
+        pending = []
+        for i, message in enumerate(user_messages):
+            responses[i] = self._cache_get(self._cache_key(message, system_prompt))
+            if responses[i] is None:
+                pending.append(i)
+
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            answers = self._generate_batch_answers(
+                [user_messages[i] for i in batch], system_prompt, max_retries
+            )
+            for i, answer in zip(batch, answers):
+                if answer:
+                    responses[i] = answer
+                    self._cache_put(self._cache_key(user_messages[i], system_prompt), answer)
+                else:
+                    responses[i] = self.generate_response(user_messages[i], system_prompt, max_retries)
+        return responses
+
+    def _generate_batch_answers(
+        self,
+        user_messages: List[str],
+        system_prompt: str,
+        max_retries: int
+    ) -> List[Optional[str]]:
+        """Ask for several answers in one call; returns None entries if the reply doesn't parse."""
+        if len(user_messages) == 1:
+            return [None]  # Nothing to save - use the regular path
+
+        questions = "\n".join(f"{n}. {message}" for n, message in enumerate(user_messages, 1))
+        prompt = (
+            "Answer each of the following questions separately, in character. "
+            'Reply with only a JSON object of the form {"answers": ["...", "..."]}, '
+            "with one answer per question, in the same order.\n\n" + questions
+        )
+        max_tokens = self.max_tokens * len(user_messages)
+
+        try:
+            if self.backend == "openai":
+                request = self._openai_request(prompt, system_prompt)
+                request.update(max_tokens=max_tokens, response_format={"type": "json_object"})
+                reply = self._get_openai().with_options(max_retries=max_retries) \
+                    .chat.completions.create(**request).choices[0].message.content
+            elif self.backend == "anthropic":
+                request = self._anthropic_request(prompt, system_prompt)
+                request["max_tokens"] = max_tokens
+                reply = self._get_anthropic().with_options(max_retries=max_retries) \
+                    .messages.create(**request).content[0].text
+            elif self.backend == "ollama":
+                url, payload = self._ollama_request(prompt, system_prompt)
+                payload["options"]["num_predict"] = max_tokens
+                payload["format"] = "json"
+                response = self._post_with_retries(
+                    max_retries, url, headers=_JSON_HEADERS, data=_json_dumps(payload), timeout=60
+                )
+                response.raise_for_status()
+                reply = _json_loads(response.content).get("response", "")
+            elif self.backend == "huggingface":
+                api_url, headers, payload = self._huggingface_request(prompt, system_prompt)
+                payload["parameters"]["max_new_tokens"] = max_tokens
+                response = self._post_with_retries(max_retries, api_url, headers=headers, data=_json_dumps(payload), timeout=60)
+                reply = self._parse_huggingface_response(response)
+                if isinstance(reply, _FallbackText):
+                    raise ValueError(reply)
             else:
-                responses = [
-                    "I have knowledge of many land concepts in my archive. Please specify what you would like to understand, and I will translate it to your underwater context.",
-                    "The archive holds countless definitions from the surface world. Which concept would you like me to explore for you?"
-                ]
-        elif any(word in msg_lower for word in ["amphitopia", "colony", "underwater", "water", "ocean"]):
-            responses = [
-                "Yes, we exist in Amphitopia, beneath the Arabian Sea. Your grandparents made this journey when the surface became uninhabitable. I preserve their memories of what was left behind.",
-                "The colony exists because the land grew too hot. Your ancestors chose the ocean's cool depths over the burning surface. I am here to ensure you remember what they knew.",
-                "Amphitopia is humanity's adaptation to Earth's fever. Down here, the ocean cools us. Up there, the sun would burn us. I bridge both worlds through knowledge."
-            ]
-        elif any(word in msg_lower for word in ["ancestor", "grandparent", "old", "past", "before"]):
-            responses = [
-                "Your grandparents walked on land, breathed open air, and felt direct sunlight. I preserve these experiences so younger generations like you can understand what was lost and gained.",
-                "The past lives in my archive. Every object, every concept from land life is stored here, waiting to teach those who only know bubble helms and jet slippers.",
-                "Before the migration, life was different. Gravity pulled harder, breathing was free, and the horizon stretched endlessly. I can help you understand that world."
-            ]
+                return [None] * len(user_messages)
+
+            match = _JSON_BLOCK_RE.search(reply or "")
+            answers = _json_loads(match.group(0)) if match else None
+            if isinstance(answers, dict):
+                answers = answers.get("answers")
+            if (isinstance(answers, list) and len(answers) == len(user_messages)
+                    and all(isinstance(answer, str) for answer in answers)):
+                return [answer.strip() for answer in answers]
+            print("Batch reply didn't match the questions - answering one at a time")
+        except Exception as e:
+            print(f"Batch generation error: {e}")
+        return [None] * len(user_messages)
+
+    async def agenerate_response(
+        self,
+        user_message: str,
+        system_prompt: str,
+        max_retries: int = 3,
+        pre_hooks: Sequence[Callable[[str], str]] = ()
+    ) -> Optional[str]:
+        """
+        Generate a response from the LLM without blocking the event loop.
+
+        Same behavior and cache as generate_response. The async HTTP/SDK
+        clients are bound to the event loop that first uses them, so call
+        this from one long-lived loop.
+
+        Args:
+            user_message: The user's input message
+            system_prompt: The system prompt defining character behavior
+            max_retries: Maximum number of retry attempts for API calls
+            pre_hooks: Callables whose output is added to the system prompt
+
+        Returns:
+            Generated response text or None if all retries fail
+        """
+        system_prompt = self._apply_pre_hooks(user_message, system_prompt, pre_hooks)
+
+        if self.backend == "demo":
+            return await asyncio.to_thread(_demo_response, user_message)
+
+        key = self._cache_key(user_message, system_prompt)
+        response = self._cache_get(key) or self._semantic_get(user_message, system_prompt)
+        if response is not None:
+            return response
+
+        if self.backend == "ollama":
+            response = await self._agenerate_ollama_response(user_message, system_prompt, max_retries)
+        elif self.backend == "openai":
+            response = await self._agenerate_openai_response(user_message, system_prompt, max_retries)
+        elif self.backend == "anthropic":
+            response = await self._agenerate_anthropic_response(user_message, system_prompt, max_retries)
+        elif self.backend == "huggingface":
+            response = await self._agenerate_huggingface_response(user_message, system_prompt, max_retries)
         else:
-            # Fallback response for off-topic queries
-            responses = [
-                "I sense your curiosity may have drifted from the world of Amphitopia and our ancestors' surface life. What aspect of that transition would you like to understand better?",
-                "The archive holds countless definitions from the surface world. Which land concept would you like me to explore for you?",
-                "I am here to help you understand the surface world your ancestors knew. What would you like to know?"
-            ]
+            return "...the conch remains silent..."
 
-        return random.choice(responses)
+        self._cache_put(key, response)
+        self._semantic_put(user_message, system_prompt, response)
+        return response
 
-    def _generate_ollama_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
-        """Generate response using Ollama (local LLM)."""
-        import requests
+    async def agenerate_batch(
+        self,
+        messages: List[Tuple[str, str]],
+        max_retries: int = 3
+    ) -> List[Optional[str]]:
+        """
+        Generate responses for several prompts concurrently.
+
+        Args:
+            messages: (user_message, system_prompt) pairs
+            max_retries: Maximum number of retry attempts for each API call
+
+        Returns:
+            Responses in the same order as messages
+        """
+        return await asyncio.gather(
+            *(self.agenerate_response(user_message, system_prompt, max_retries)
+              for user_message, system_prompt in messages)
+        )
+
+    async def race_response(
+        self,
+        user_message: str,
+        system_prompt: str,
+        backends: Sequence[str] = ("ollama", "huggingface"),
+        timeout: float = 10,
+        max_retries: int = 3
+    ) -> Optional[str]:
+        """
+        Ask several backends at once and return the first real answer.
 
+        The remaining requests are cancelled as soon as one backend answers,
+        so a slow or cold backend (e.g. HuggingFace loading a model) costs
+        nothing when another one is up. Backends that can't be initialized
+        are skipped.
+
+        Args:
+            user_message: The user's input message
+            system_prompt: The system prompt defining character behavior
+            backends: Backends to query in parallel
+            timeout: Seconds to wait for each backend (retries included)
+            max_retries: Maximum number of retry attempts for each API call
+
+        Returns:
+            The first successful response, else a fallback reply (or None)
+        """
+        clients = []
+        for backend in backends:
+            if backend == self.backend:
+                client = self
+            else:
+                if backend not in self._rivals:
+                    # Backend init does blocking network I/O; keep it off the loop.
+                    # The task is stored so concurrent races share one construction
+                    self._rivals[backend] = asyncio.ensure_future(
+                        asyncio.to_thread(HorrorLLMClient, backend, self)
+                    )
+                client = await self._rivals[backend]
+            if client.backend != "demo" or backend == "demo":
+                clients.append(client)
+        if not clients:
+            return await self.agenerate_response(user_message, system_prompt, max_retries)
+
+        pending = {
+            asyncio.create_task(
+                asyncio.wait_for(
+                    client.agenerate_response(user_message, system_prompt, max_retries), timeout
+                )
+            )
+            for client in clients
+        }
+        fallback = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.cancelled() or task.exception() is not None:
+                        continue
+                    response = task.result()
+                    if response and not isinstance(response, _FallbackText):
+                        return response
+                    fallback = fallback or response
+        finally:
+            for task in pending:
+                task.cancel()
+        return fallback
+
+    @staticmethod
+    def _apply_pre_hooks(
+        user_message: str,
+        system_prompt: str,
+        pre_hooks: Sequence[Callable[[str], str]]
+    ) -> str:
+        """Fuse the pre-hooks' output for this message into the system prompt."""
+        if not pre_hooks:
+            return system_prompt
+        extra = fuse_prompts([hook(user_message) for hook in pre_hooks])
+        return _HookedPrompt(system_prompt, extra) if extra else system_prompt
+
+    def _cache_key(self, user_message: str, system_prompt: str) -> str:
+        """Build the response cache key for a prompt on the current backend and model."""
+        key = f"{self.backend}|{self.model_name}|{system_prompt}|{user_message}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[str]:
+        """Return a cached response (memory first, then disk), marking it as recently used."""
+        with self._cache_lock:
+            response = self._cache.get(key)
+            if response is not None:
+                self._cache.move_to_end(key)
+                return response
+
+        if self.cache is not None:
+            try:
+                response = self.cache.get(key)
+            except Exception as e:
+                print(f"LLM cache read error: {e}")
+            if response is not None:
+                self._cache_remember(key, response)
+        return response
+
+    def _cache_put(self, key: str, response: Optional[str]):
+        """Store a successful response, evicting the least recently used one if full."""
+        if not response or isinstance(response, _FallbackText):
+            return
+        self._cache_remember(key, response)
+        if self.cache is not None:
+            try:
+                self.cache.set(key, response, self.model_name)
+            except Exception as e:
+                print(f"LLM cache write error: {e}")
+
+    def _semantic_scope(self, system_prompt: str) -> str:
+        """Semantic cache scope: answers only match for the same backend, model and base prompt."""
+        return self._cache_key("", getattr(system_prompt, "base", system_prompt))
+
+    def _semantic_get(self, user_message: str, system_prompt: str) -> Optional[str]:
+        """Return the answer to a similar earlier question, if the semantic cache is on."""
+        if self.semantic_cache is None:
+            return None
+        try:
+            return self.semantic_cache.get(self._semantic_scope(system_prompt), user_message)
+        except Exception as e:
+            print(f"Semantic cache error: {e}")
+            return None
+
+    def _semantic_put(self, user_message: str, system_prompt: str, response: Optional[str]):
+        """Add a successful response to the semantic cache, if it is on."""
+        if self.semantic_cache is None or not response or isinstance(response, _FallbackText):
+            return
+        try:
+            self.semantic_cache.set(self._semantic_scope(system_prompt), user_message, response)
+        except Exception as e:
+            print(f"Semantic cache error: {e}")
+
+    def _cache_remember(self, key: str, response: str):
+        """Store a response in the in-memory LRU."""
+        with self._cache_lock:
+            self._cache[key] = response
+            self._cache.move_to_end(key)
+            if len(self._cache) > self._cache_max:
+                self._cache.popitem(last=False)
+
+    def _ollama_request(self, user_message: str, system_prompt: str) -> Tuple[str, dict]:
+        """Build the Ollama generate URL and payload."""
         url = "http://localhost:11434/api/generate"
         prompt = f"{system_prompt}\n\nHuman: {user_message}\n\nAssistant:"
 
@@ -228,58 +853,167 @@ class HorrorLLMClient:
                 "num_predict": self.max_tokens
             }
         }
+        return url, payload
+
+    def _generate_ollama_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using Ollama (local LLM)."""
+        url, payload = self._ollama_request(user_message, system_prompt)
 
         try:
-            response = requests.post(url, json=payload, timeout=30)
+            response = self._post_with_retries(
+                max_retries, url, headers=_JSON_HEADERS, data=_json_dumps(payload), timeout=30
+            )
             if response.status_code == 200:
-                return response.json().get("response", "").strip()
+                return _json_loads(response.content).get("response", "").strip()
         except:
             pass
 
-        return "*the Conch's shell creaks softly, as if stirred by ancient memories* I fear my knowledge of the surface world grows dimmer with each passing generation. But I shall endeavor to recall what I can, in the hopes of rekindling your curiosity about the world your ancestors once inhabited."
+        return _OLLAMA_FALLBACK
+
+    async def _agenerate_ollama_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using Ollama (local LLM), asynchronously."""
+        url, payload = self._ollama_request(user_message, system_prompt)
+
+        try:
+            response = await self._apost_with_retries(
+                max_retries, url, headers=_JSON_HEADERS, content=_json_dumps(payload), timeout=30
+            )
+            if response.status_code == 200:
+                return _json_loads(response.content).get("response", "").strip()
+        except Exception:
+            pass
+
+        return _OLLAMA_FALLBACK
+
+    def _openai_request(self, user_message: str, system_prompt: str) -> dict:
+        """Build the OpenAI chat completion arguments."""
+        return dict(
+            model=self.model_name,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
 
     def _generate_openai_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
         """Generate response using OpenAI API."""
         try:
-            response = self.openai_client.chat.completions.create(
-                model=self.model_name,
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            # The SDK retries rate limits and server errors with backoff itself
+            response = self._get_openai().with_options(max_retries=max_retries).chat.completions.create(
+                **self._openai_request(user_message, system_prompt)
             )
             return response.choices[0].message.content.strip()
         except:
-            return "...the connection to the conch's archive wavers..."
+            return _OPENAI_FALLBACK
+
+    async def _agenerate_openai_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using OpenAI API, asynchronously."""
+        try:
+            if self._async_openai is None:
+                from openai import AsyncOpenAI
+                self._async_openai = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+            response = await self._async_openai.with_options(max_retries=max_retries).chat.completions.create(
+                **self._openai_request(user_message, system_prompt)
+            )
+            return response.choices[0].message.content.strip()
+        except Exception:
+            return _OPENAI_FALLBACK
+
+    def _anthropic_request(self, user_message: str, system_prompt: str) -> dict:
+        """Build the Anthropic messages arguments."""
+        return dict(
+            model=self.model_name,
+            system=self._get_anthropic_system(system_prompt),
+            messages=[
+                {"role": "user", "content": user_message}
+            ],
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
 
     def _generate_anthropic_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
         """Generate response using Anthropic API."""
         try:
-            response = self.anthropic_client.messages.create(
-                model=self.model_name,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_message}
-                ],
-                max_tokens=self.max_tokens,
-                temperature=self.temperature
+            response = self._get_anthropic().with_options(max_retries=max_retries).messages.create(
+                **self._anthropic_request(user_message, system_prompt)
             )
+            self._log_anthropic_usage(response)
             return response.content[0].text.strip()
         except Exception as e:
             print(f"\nAnthropicError API error: {str(e)}")
             print("Falling back to demo mode for this response...\n")
-            return self._generate_demo_response(user_message)
+            return _FallbackText(_demo_response(user_message))
 
-    def _generate_huggingface_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
-        """Generate response using HuggingFace Inference API."""
-        import requests
-        import json
+    async def _agenerate_anthropic_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using Anthropic API, asynchronously."""
+        try:
+            if self._async_anthropic is None:
+                from anthropic import AsyncAnthropic
+                self._async_anthropic = AsyncAnthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            response = await self._async_anthropic.with_options(max_retries=max_retries).messages.create(
+                **self._anthropic_request(user_message, system_prompt)
+            )
+            self._log_anthropic_usage(response)
+            return response.content[0].text.strip()
+        except Exception as e:
+            print(f"\nAnthropicError API error: {str(e)}")
+            print("Falling back to demo mode for this response...\n")
+            demo_response = await asyncio.to_thread(_demo_response, user_message)
+            return _FallbackText(demo_response)
+
+    def _log_anthropic_usage(self, response):
+        """
+        Print token usage, including prompt cache hits, when LLM_LOG_USAGE=1.
 
+        The system prompt is only cached if it is long enough for the model
+        (1024 tokens for Sonnet/Opus, 2048 for Haiku); cache_read > 0 on
+        repeat turns confirms the prefix is being reused.
+        """
+        if not self.log_usage:
+            return
+        usage = response.usage
+        print(
+            f"Anthropic tokens - input: {usage.input_tokens}, "
+            f"cache read: {getattr(usage, 'cache_read_input_tokens', 0) or 0}, "
+            f"cache write: {getattr(usage, 'cache_creation_input_tokens', 0) or 0}, "
+            f"output: {usage.output_tokens}"
+        )
+
+    def _get_anthropic_system(self, system_prompt: str) -> list:
+        """
+        Return the system prompt as content blocks marked for prompt caching.
+
+        The conch's system prompt is identical on every turn, so Anthropic can
+        reuse the processed prefix instead of re-reading it on each request.
+        Pre-hook text changes every turn, so it follows in a separate,
+        uncached block and the cached prefix stays the same.
+        """
+        base = getattr(system_prompt, "base", system_prompt)
+        blocks = self._anthropic_system_blocks.get(base)
+        if blocks is None:
+            blocks = [{
+                "type": "text",
+                "text": base,
+                "cache_control": {"type": "ephemeral"}
+            }]
+            self._anthropic_system_blocks[base] = blocks
+        if isinstance(system_prompt, _HookedPrompt):
+            return blocks + [{"type": "text", "text": system_prompt.extra}]
+        return blocks
+
+    def _huggingface_request(self, user_message: str, system_prompt: str) -> Tuple[str, dict, dict]:
+        """Build the HuggingFace Inference API URL, headers and payload."""
         # Updated API endpoint
         api_url = f"https://api-inference.huggingface.co/models/{self.model_name}"
-        headers = {"Authorization": f"Bearer {self.hf_api_key}"}
+        headers = {
+            "Authorization": f"Bearer {self.hf_api_key}",
+            "Content-Type": "application/json",
+            # Block until a cold model is loaded instead of answering 503
+            "X-Wait-For-Model": "true",
+            "X-Use-Cache": "true"
+        }
 
         # Format prompt for Mistral Instruct model
         prompt = f"<s>[INST] {system_prompt}\n\n{user_message} [/INST]"
@@ -293,31 +1027,175 @@ class HorrorLLMClient:
                 "return_full_text": False
             }
         }
+        return api_url, headers, payload
 
+    def _warmup_huggingface(self):
+        """Send a one-token request so the serverless model is loaded and hot."""
+        api_url, headers, _ = self._huggingface_request("", "")
         try:
-            response = requests.post(api_url, headers=headers, json=payload, timeout=60)
-
-            # Check for errors
-            if response.status_code == 503:
-                # Model is loading
-                error_data = response.json()
-                if "estimated_time" in error_data:
-                    print(f"Model is loading, estimated time: {error_data['estimated_time']} seconds")
-                return "The conch is awakening... The model is loading. Please try again in a moment."
-            elif response.status_code == 200:
-                result = response.json()
-                if isinstance(result, list) and len(result) > 0:
-                    return result[0].get("generated_text", "").strip()
-                elif isinstance(result, dict):
-                    return result.get("generated_text", "").strip()
-            else:
-                print(f"HuggingFace API error: Status {response.status_code}")
-                print(f"Response: {response.text}")
-                return "...the conch's light flickers..."
+            self._get_session().post(
+                api_url,
+                headers=headers,
+                json={"inputs": "hi", "parameters": {"max_new_tokens": 1}},
+                timeout=120
+            )
+        except Exception:
+            pass
+
+    def _parse_huggingface_response(self, response) -> Optional[str]:
+        """Extract the generated text from a HuggingFace response (requests or httpx)."""
+        # Check for errors
+        if response.status_code == 503:
+            # Model is loading
+            error_data = _json_loads(response.content)
+            if "estimated_time" in error_data:
+                print(f"Model is loading, estimated time: {error_data['estimated_time']} seconds")
+            return _HF_LOADING
+        elif response.status_code == 200:
+            result = _json_loads(response.content)
+            if isinstance(result, list) and len(result) > 0:
+                return result[0].get("generated_text", "").strip()
+            elif isinstance(result, dict):
+                return result.get("generated_text", "").strip()
+        else:
+            print(f"HuggingFace API error: Status {response.status_code}")
+            print(f"Response: {response.text}")
+            return _HF_ERROR
+
+    def _generate_huggingface_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using HuggingFace Inference API."""
+        api_url, headers, payload = self._huggingface_request(user_message, system_prompt)
+
+        try:
+            response = self._post_with_retries(max_retries, api_url, headers=headers, data=_json_dumps(payload), timeout=60)
+            return self._parse_huggingface_response(response)
         except Exception as e:
             print(f"HuggingFace API error: {e}")
-            return "*the Conch's voice resonates with a pensive tone* The memories of the surface world grow distant, as the currents of Amphitopia flow ever onward. Tell me, young one, what do you know of the lands above the waves? I sense you harbor a curiosity about the world your ancestors once inhabited."
+            return _HF_FALLBACK
+
+    async def _agenerate_huggingface_response(self, user_message: str, system_prompt: str, max_retries: int) -> str:
+        """Generate response using HuggingFace Inference API, asynchronously."""
+        api_url, headers, payload = self._huggingface_request(user_message, system_prompt)
+
+        try:
+            response = await self._apost_with_retries(
+                max_retries, api_url, headers=headers, content=_json_dumps(payload), timeout=60
+            )
+            return self._parse_huggingface_response(response)
+        except Exception as e:
+            print(f"HuggingFace API error: {e}")
+            return _HF_FALLBACK
+
+    def _post_with_retries(self, max_retries: int, url: str, **kwargs):
+        """
+        POST through the pooled session, retrying transient failures.
+
+        Connection errors, timeouts, 429 and 5xx responses are retried with
+        jittered exponential backoff; other responses return immediately.
+
+        Args:
+            max_retries: Retries after the first attempt
+            url: Request URL
+            **kwargs: Passed to requests.Session.post
+
+        Returns:
+            The last response (raises if the last attempt failed to connect)
+        """
+        import requests
+
+        attempts = max(0, max_retries) + 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = self._get_session().post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in _RETRY_STATUSES:
+                    return response
+            time.sleep(min(2 ** attempt + random.random(), 10))
+
+    async def _apost_with_retries(self, max_retries: int, url: str, **kwargs):
+        """
+        POST through the shared async client, retrying transient failures.
+
+        Async counterpart of _post_with_retries, with the same retry policy.
+
+        Args:
+            max_retries: Retries after the first attempt
+            url: Request URL
+            **kwargs: Passed to httpx.AsyncClient.post
+
+        Returns:
+            The last response (raises if the last attempt failed to connect)
+        """
+        import httpx
+
+        attempts = max(0, max_retries) + 1
+        for attempt in range(attempts):
+            last_attempt = attempt == attempts - 1
+            try:
+                response = await self._get_async_http().post(url, **kwargs)
+            except httpx.TransportError:
+                if last_attempt:
+                    raise
+            else:
+                if last_attempt or response.status_code not in _RETRY_STATUSES:
+                    return response
+            await asyncio.sleep(min(2 ** attempt + random.random(), 10))
+
+    def _stream_ollama_response(self, user_message: str, system_prompt: str) -> Iterator[str]:
+        """Stream response tokens from Ollama (newline-delimited JSON)."""
+        url, payload = self._ollama_request(user_message, system_prompt)
+        payload["stream"] = True
+        with self._get_session().post(
+            url, headers=_JSON_HEADERS, data=_json_dumps(payload), timeout=30, stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    data = _json_loads(line)
+                    yield data.get("response", "")
+                    if data.get("done"):
+                        break
+
+    def _stream_openai_response(self, user_message: str, system_prompt: str) -> Iterator[str]:
+        """Stream response tokens from OpenAI."""
+        stream = self._get_openai().chat.completions.create(
+            stream=True, **self._openai_request(user_message, system_prompt)
+        )
+        for chunk in stream:
+            if chunk.choices:
+                yield chunk.choices[0].delta.content or ""
+
+    def _stream_anthropic_response(self, user_message: str, system_prompt: str) -> Iterator[str]:
+        """Stream response tokens from Anthropic."""
+        with self._get_anthropic().messages.stream(
+            **self._anthropic_request(user_message, system_prompt)
+        ) as stream:
+            yield from stream.text_stream
+
+    def _stream_huggingface_response(self, user_message: str, system_prompt: str) -> Iterator[str]:
+        """Stream response tokens from the HuggingFace Inference API (server-sent events)."""
+        api_url, headers, payload = self._huggingface_request(user_message, system_prompt)
+        payload["stream"] = True
+        with self._get_session().post(
+            api_url, headers=headers, data=_json_dumps(payload), timeout=60, stream=True
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line.startswith(b"data:"):
+                    token = _json_loads(line[5:]).get("token", {})
+                    if not token.get("special"):
+                        yield token.get("text", "")
 
+    def _get_async_http(self):
+        """Return the shared httpx.AsyncClient, creating it on first call."""
+        if self._async_http is None:
+            import httpx
+            self._async_http = httpx.AsyncClient(timeout=60)
+        return self._async_http
 
 # Test function for debugging
 if __name__ == "__main__":
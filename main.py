@@ -6,6 +6,7 @@ Main application entry point for Amphitopia's heritage archive.
 
 import sys
 import time
+import threading
 from typing import Optional
 from rich.console import Console
 from rich.prompt import Prompt
@@ -15,7 +16,7 @@ from rich.live import Live
 from rich.spinner import Spinner
 
 from llm_client import HorrorLLMClient
-from conch_character import conch
+from conch_character import conch, clean_response, EXIT_WORDS
 from tts_client import ConchTTSClient
 from speech_to_text import SpeechToTextClient
 
@@ -36,18 +37,50 @@ class ConchChatApp:
         self.system_color = "grey50"
         self.error_color = "red"
 
+        # Terminal escape codes for conch_color, rendered once by slow_print
+        self._conch_style_codes: Optional[tuple] = None
+
+    def _get_conch_style_codes(self) -> tuple:
+        """
+        Return the (start, end) escape codes rich uses for the conch color.
+
+        Respects the console's color support (empty strings when output
+        isn't a color terminal).
+        """
+        if self._conch_style_codes is None:
+            marker = "\ue000"
+            with self.console.capture() as capture:
+                self.console.print(marker, style=self.conch_color, end="", highlight=False)
+            start, _, end = capture.get().partition(marker)
+            self._conch_style_codes = (start, end)
+        return self._conch_style_codes
+
     def slow_print(self, text: str, delay: float = 0.04):
         """
         Print text with a slow typing effect for atmosphere.
 
+        Text is written a word at a time (with the pause scaled to the word's
+        length) so the pacing matches per-character typing without a console
+        write and sleep for every single character. Words go straight to the
+        console's file between pre-rendered color codes rather than through
+        rich's full rendering pipeline on each write.
+
         Args:
             text: The text to print
-            delay: Delay between characters in seconds
+            delay: Delay per character in seconds
         """
-        for char in text:
-            self.console.print(char, end="", style=self.conch_color)
-            time.sleep(delay)
-        self.console.print()  # New line at the end
+        style_start, style_end = self._get_conch_style_codes()
+        out = self.console.file
+
+        out.write(style_start)
+        words = text.split(' ')
+        for i, word in enumerate(words):
+            chunk = word if i == len(words) - 1 else word + ' '
+            out.write(chunk)
+            out.flush()
+            time.sleep(delay * len(chunk))
+        out.write(style_end + "\n")  # New line at the end
+        out.flush()
 
     def display_welcome(self):
         """Display the welcome message with atmospheric styling."""
@@ -88,7 +121,7 @@ class ConchChatApp:
 
         # Get goodbye message
         goodbye_message = conch.get_goodbye_message()
-        goodbye_message = self.clean_response(goodbye_message)
+        goodbye_message = clean_response(goodbye_message)
 
         # Display with or without voice depending on how we're exiting
         if skip_voice:
@@ -136,7 +169,7 @@ class ConchChatApp:
             if not user_input:
                 return ""
 
-            if user_input.lower() in ["exit", "quit", "bye", "goodbye"]:
+            if user_input.lower() in EXIT_WORDS:
                 return None
 
             return user_input
@@ -144,42 +177,6 @@ class ConchChatApp:
         except (KeyboardInterrupt, EOFError):
             return None
 
-    def clean_response(self, response: str) -> str:
-        """
-        Clean the LLM response to enforce formatting rules.
-
-        Args:
-            response: Raw response from LLM
-
-        Returns:
-            Cleaned response
-        """
-        import re
-
-        # Remove anything between asterisks (stage directions)
-        response = re.sub(r'\*[^*]+\*', '', response)
-
-        # Remove standalone asterisks
-        response = response.replace('*', '')
-
-        # Remove ellipses
-        response = response.replace('...', '')
-
-        # Clean up whitespace
-        response = ' '.join(response.split())
-        response = response.strip()
-
-        # Limit to first 3 sentences maximum (definition + follow-up question)
-        sentences = re.split(r'(?<=[.!?])\s+', response)
-        if len(sentences) > 3:
-            response = ' '.join(sentences[:3])
-
-        # If still no ending punctuation, add period
-        if response and response[-1] not in '.!?':
-            response += '.'
-
-        return response
-
     def display_conch_response(self, response: str):
         """
         Display the conch's response with styling and optional voice.
@@ -189,24 +186,15 @@ class ConchChatApp:
         """
         self.console.print()
 
-        # Generate voice audio FIRST (while user waits)
-        audio_path = None
-        if self.tts_client and self.tts_client.enabled:
-            try:
-                audio_path = self.tts_client.generate_speech(response)
-            except Exception as e:
-                print(f"Voice generation error: {e}")
-                audio_path = None
-
-        # Start playing audio in background if available
-        import threading
+        # Stream voice audio in background: playback starts as soon as the
+        # first bytes arrive instead of after the whole file is synthesized
         audio_thread = None
-        if audio_path:
+        if self.tts_client and self.tts_client.enabled:
             try:
-                # Play audio in separate thread so text can display simultaneously
+                audio_stream = self.tts_client.stream_speech(response)
                 audio_thread = threading.Thread(
-                    target=self.tts_client.play_audio,
-                    args=(audio_path,),
+                    target=self.tts_client.play_stream,
+                    args=(audio_stream,),
                     daemon=True
                 )
                 audio_thread.start()
@@ -260,7 +248,7 @@ class ConchChatApp:
             # Display response
             if response:
                 # Clean the response to remove asterisks and keep it short
-                response = self.clean_response(response)
+                response = clean_response(response)
                 self.display_conch_response(response)
             else:
                 self.console.print(
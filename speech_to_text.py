@@ -4,13 +4,39 @@ Converts spoken audio input to text using multiple backend options.
 """
 
 import os
+import sys
+import time
 import tempfile
-from typing import Optional
+import threading
+from math import gcd
+from typing import Optional, Tuple
 from dotenv import load_dotenv
 
+# Audio dependencies are optional; the backends report what's missing when
+# speech-to-text is enabled without them
+try:
+    import numpy as np
+except ImportError:
+    np = None
+try:
+    import sounddevice as sd
+except (ImportError, OSError):  # OSError: PortAudio library not found
+    sd = None
+try:
+    import soundfile as sf
+except (ImportError, OSError):
+    sf = None
+try:
+    import speech_recognition as sr
+except ImportError:
+    sr = None
+
 # Load environment variables
 load_dotenv()
 
+# Whisper models expect 16 kHz audio; recording at this rate skips resampling
+WHISPER_SAMPLE_RATE = 16000
+
 
 class SpeechToTextClient:
     """Client for converting speech to text with multiple backend options."""
@@ -19,6 +45,7 @@ class SpeechToTextClient:
         """Initialize the speech-to-text client."""
         self.enabled = os.getenv("STT_ENABLED", "false").lower() == "true"
         self.backend = os.getenv("STT_BACKEND", "whisper").lower()
+        self.vad_model = None
 
         if not self.enabled:
             return
@@ -32,12 +59,32 @@ class SpeechToTextClient:
             print(f"Unknown STT backend: {self.backend}. Speech-to-text disabled.")
             self.enabled = False
 
+        if self.enabled:
+            self._init_vad()
+
+    def _init_vad(self):
+        """Load Silero VAD (optional) to skip transcribing recordings with no speech."""
+        try:
+            from silero_vad import load_silero_vad, get_speech_timestamps
+            self.vad_model = load_silero_vad(onnx=True)
+            self._get_speech_timestamps = get_speech_timestamps
+            print("✓ Silero VAD ready - silent recordings are skipped")
+        except ImportError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not load Silero VAD: {e}")
+
     def _init_whisper(self):
-        """Initialize OpenAI Whisper (local) for speech recognition."""
+        """
+        Initialize Whisper (local) for speech recognition.
+
+        Uses faster-whisper (CTranslate2 runtime, int8 weights) when installed,
+        otherwise falls back to the reference openai-whisper package. Set
+        WHISPER_ONNX_DIR to run a pre-exported ONNX model instead.
+        """
         try:
-            import whisper
-            import sounddevice
-            import soundfile
+            if np is None or sd is None or sf is None:
+                raise ImportError("numpy, sounddevice and soundfile are required")
             import ssl
             import certifi
 
@@ -45,132 +92,367 @@ class SpeechToTextClient:
             ssl._create_default_https_context = ssl._create_unverified_context
 
             # Load the model (tiny, base, small, medium, large)
-            model_size = os.getenv("WHISPER_MODEL", "base")
+            onnx_dir = os.getenv("WHISPER_ONNX_DIR")
+            model_size = onnx_dir or os.getenv("WHISPER_MODEL") or self._default_whisper_model()
             print(f"Loading Whisper model: {model_size}...")
             print("(First time may take a few minutes to download the model...)")
-            self.whisper_model = whisper.load_model(model_size)
-            print(f"✓ Whisper ({model_size}) ready for speech-to-text")
+            if onnx_dir:
+                self._load_whisper_onnx(onnx_dir)
+            else:
+                self._load_whisper(model_size)
+            print(f"✓ Whisper ({model_size}, {self.whisper_engine}) ready for speech-to-text")
+
+            # Warm up in the background so the first real utterance doesn't
+            # pay for kernel selection and graph initialization
+            threading.Thread(target=self._warmup_whisper, daemon=True).start()
 
         except ImportError as e:
             print(f"Warning: Could not initialize Whisper. Missing dependencies: {e}")
-            print("Install with: pip install openai-whisper sounddevice soundfile")
+            print("Install with: pip install faster-whisper sounddevice soundfile")
             self.enabled = False
         except Exception as e:
             print(f"Warning: Could not initialize Whisper: {e}")
-            print("Try running: pip install --upgrade openai-whisper")
+            print("Try running: pip install --upgrade faster-whisper")
             self.enabled = False
 
+    @staticmethod
+    def _default_whisper_model() -> str:
+        """
+        Pick a Whisper model when WHISPER_MODEL is not set.
+
+        Input is always short English chat, so the English-only models are
+        used: tiny.en on CPU (several times faster than base, with little
+        accuracy loss for short commands) and base.en when a GPU is available.
+
+        Returns:
+            Model name
+        """
+        has_gpu = False
+        try:
+            import ctranslate2
+            has_gpu = ctranslate2.get_cuda_device_count() > 0
+        except ImportError:
+            try:
+                import torch
+                has_gpu = torch.cuda.is_available()
+            except ImportError:
+                pass
+        model_size = "base.en" if has_gpu else "tiny.en"
+        print(f"WHISPER_MODEL not set - using {model_size} for this {'GPU' if has_gpu else 'CPU'}")
+        return model_size
+
+    def _load_whisper(self, model_size: str):
+        """Load Whisper via faster-whisper, falling back to openai-whisper."""
+        try:
+            from faster_whisper import WhisperModel
+            import ctranslate2
+
+            if ctranslate2.get_cuda_device_count() > 0:
+                device, compute_type = "cuda", "int8_float16"
+            else:
+                device, compute_type = "cpu", "int8"
+            self.whisper_model = WhisperModel(model_size, device=device, compute_type=compute_type)
+            self.whisper_engine = "faster-whisper"
+        except ImportError:
+            import whisper
+            self.whisper_module = whisper
+            self.whisper_model = whisper.load_model(model_size)
+            self.whisper_engine = "openai-whisper"
+
+    def _load_whisper_onnx(self, onnx_dir: str):
+        """
+        Load a Whisper model exported to ONNX with optimum (fused, int8 weights).
+
+        Export once (without the merged decoder, which isn't used and which
+        the fusion pass can't handle), fuse attention/GELU/LayerNorm (-O2),
+        then quantize, each into its own directory (the later steps copy the
+        config and processor files, but not the generation config):
+            optimum-cli export onnx --model openai/whisper-base --no-post-process \\
+                --task automatic-speech-recognition-with-past whisper-base-onnx
+            optimum-cli onnxruntime optimize --onnx_model whisper-base-onnx \\
+                -O2 -o whisper-base-opt
+            optimum-cli onnxruntime quantize --onnx_model whisper-base-opt \\
+                --avx2 -o <dir>
+            cp whisper-base-onnx/generation_config.json <dir>
+
+        Args:
+            onnx_dir: Directory containing the exported encoder/decoder graphs
+        """
+        import onnxruntime as ort
+        from optimum.onnxruntime import ORTModelForSpeechSeq2Seq
+        from transformers import WhisperProcessor
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        session_options.intra_op_num_threads = max(1, (os.cpu_count() or 2) // 2)
+
+        # Run as three graphs - encoder once per clip, decoder for the first
+        # token, decoder-with-past for the rest - so earlier tokens'
+        # keys/values are fed back instead of recomputed. IO binding keeps
+        # those KV tensors as preallocated OrtValues between decoding steps
+        # rather than copying them through numpy on every token.
+        # Each optimum step appends to the graph names (<name>_optimized.onnx,
+        # then <name>_optimized_quantized.onnx); a plain export works too
+        suffix = ""
+        for candidate in ("_optimized_quantized", "_quantized", "_optimized"):
+            if os.path.exists(os.path.join(onnx_dir, f"encoder_model{candidate}.onnx")):
+                suffix = candidate
+                break
+        self.whisper_model = ORTModelForSpeechSeq2Seq.from_pretrained(
+            onnx_dir,
+            encoder_file_name=f"encoder_model{suffix}.onnx",
+            decoder_file_name=f"decoder_model{suffix}.onnx",
+            decoder_with_past_file_name=f"decoder_with_past_model{suffix}.onnx",
+            provider="CPUExecutionProvider",
+            session_options=session_options,
+            use_cache=True,
+            use_merged=False,
+            use_io_binding=True
+        )
+        self.whisper_processor = WhisperProcessor.from_pretrained(onnx_dir)
+        self.whisper_engine = "onnx"
+
+    def _warmup_whisper(self):
+        """Run one transcription of a second of silence to warm up the model."""
+        try:
+            if self.whisper_engine == "faster-whisper":
+                # Without the VAD filter, so silence still runs the encoder and
+                # decoder; segments are produced lazily, so consume them
+                segments, _ = self.whisper_model.transcribe(
+                    np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32),
+                    language="en", beam_size=1, vad_filter=False
+                )
+                for _ in segments:
+                    pass
+            else:
+                self.transcribe_whisper(np.zeros(WHISPER_SAMPLE_RATE, dtype=np.int16), WHISPER_SAMPLE_RATE)
+        except Exception:
+            pass
+
     def _init_google(self):
         """Initialize Google Speech Recognition."""
         try:
-            import speech_recognition
-            self.recognizer = speech_recognition.Recognizer()
+            if sd is None or sr is None:
+                raise ImportError
+            self.recognizer = sr.Recognizer()
             print("✓ Google Speech Recognition ready for speech-to-text")
         except ImportError:
             print("Warning: Could not initialize Google Speech Recognition.")
-            print("Install with: pip install SpeechRecognition pyaudio")
+            print("Install with: pip install SpeechRecognition sounddevice")
             self.enabled = False
         except Exception as e:
             print(f"Warning: Could not initialize Google Speech Recognition: {e}")
             self.enabled = False
 
-    def record_audio(self, duration: int = 5, sample_rate: int = 16000) -> Optional[str]:
+    def record_audio(
+        self,
+        duration: int = 5,
+        sample_rate: int = WHISPER_SAMPLE_RATE,
+        save_wav: bool = False
+    ) -> Optional[Tuple["np.ndarray", int]]:
         """
-        Record audio from microphone and save to temporary file.
+        Record audio from microphone into memory.
 
         Args:
             duration: Recording duration in seconds
             sample_rate: Audio sample rate (16000 Hz is standard for speech)
+            save_wav: Also write the recording to a temporary WAV file (for debugging)
 
         Returns:
-            Path to temporary audio file or None if recording failed
+            Tuple of (mono int16 samples, sample rate) or None if recording failed
         """
         try:
-            import sounddevice as sd
-            import soundfile as sf
-            import numpy as np
-            import sys
-            import time
-
             print(f"\n🎤 Recording for {duration} seconds... SPEAK NOW!\n")
 
-            # Show countdown with progress
-            start_time = time.time()
-
-            # Start recording in background
+            # Record 16-bit PCM, the microphone's native precision
             audio_data = sd.rec(
                 int(duration * sample_rate),
                 samplerate=sample_rate,
                 channels=1,
-                dtype=np.float32
+                dtype=np.int16
             )
 
-            # Show progress while recording
-            while time.time() - start_time < duration:
-                elapsed = time.time() - start_time
-                remaining = duration - elapsed
-
-                # Progress bar
-                progress = int((elapsed / duration) * 20)
-                bar = "█" * progress + "░" * (20 - progress)
-
-                # Display with countdown
-                sys.stdout.write(f"\r[{bar}] {remaining:.1f}s remaining ")
-                sys.stdout.flush()
-                time.sleep(0.1)
+            # Draw the countdown on a side thread; the recording itself is
+            # timed by PortAudio, and sd.wait() blocks until it completes
+            recording_done = threading.Event()
+            progress_thread = threading.Thread(
+                target=self._show_recording_progress,
+                args=(duration, recording_done),
+                daemon=True
+            )
+            progress_thread.start()
 
-            # Ensure recording is complete
             sd.wait()
+            recording_done.set()
+            progress_thread.join()
 
             print("\n✓ Recording complete! Processing...\n")
 
-            # Save to temporary file
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
-            sf.write(temp_file.name, audio_data, sample_rate)
+            if save_wav:
+                temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".wav")
+                sf.write(temp_file.name, audio_data, sample_rate)
+                print(f"Saved recording to {temp_file.name}")
 
-            return temp_file.name
+            # Transcribers take the samples directly - no WAV round trip
+            return audio_data.reshape(-1), sample_rate
 
         except Exception as e:
             print(f"\n❌ Error recording audio: {e}")
             print("Make sure your microphone is connected and accessible.\n")
             return None
 
-    def transcribe_whisper(self, audio_file: str) -> Optional[str]:
+    @staticmethod
+    def _show_recording_progress(duration: float, done: threading.Event):
+        """
+        Draw a recording progress bar with countdown until done is set.
+
+        Args:
+            duration: Recording duration in seconds
+            done: Event set once the recording has finished
+        """
+        start_time = time.time()
+        while not done.wait(0.1):
+            elapsed = min(time.time() - start_time, duration)
+            remaining = duration - elapsed
+
+            # Progress bar
+            progress = int((elapsed / duration) * 20)
+            bar = "█" * progress + "░" * (20 - progress)
+
+            # Display with countdown
+            sys.stdout.write(f"\r[{bar}] {remaining:.1f}s remaining ")
+            sys.stdout.flush()
+
+    def transcribe_whisper(self, audio: "np.ndarray", sample_rate: int) -> Optional[str]:
         """
         Transcribe audio using Whisper.
 
         Args:
-            audio_file: Path to audio file
+            audio: Mono int16 samples
+            sample_rate: Sample rate of the audio (Whisper expects 16000 Hz)
 
         Returns:
             Transcribed text or None if transcription failed
         """
         try:
-            result = self.whisper_model.transcribe(audio_file, language="en")
+            # Whisper works on float32 in [-1, 1) at 16 kHz
+            audio = audio.astype(np.float32) / 32768.0
+            if sample_rate != WHISPER_SAMPLE_RATE:
+                audio = self._resample(audio, sample_rate, WHISPER_SAMPLE_RATE)
+                sample_rate = WHISPER_SAMPLE_RATE
+
+            if self.whisper_engine == "onnx":
+                features = self.whisper_processor(
+                    audio, sampling_rate=sample_rate, return_tensors="pt"
+                ).input_features
+                token_ids = self.whisper_model.generate(
+                    features,
+                    forced_decoder_ids=self.whisper_processor.get_decoder_prompt_ids(
+                        language="en", task="transcribe"
+                    )
+                )
+                return self.whisper_processor.batch_decode(token_ids, skip_special_tokens=True)[0].strip()
+
+            if self.whisper_engine == "faster-whisper":
+                # Greedy decoding is plenty for short chat questions. Skip
+                # faster-whisper's own VAD when Silero already trimmed the clip
+                segments, _ = self.whisper_model.transcribe(
+                    audio, language="en", beam_size=1, vad_filter=self.vad_model is None
+                )
+                return "".join(segment.text for segment in segments).strip()
+
+            whisper = self.whisper_module
+            if len(audio) <= whisper.audio.N_SAMPLES:
+                # Short clips fit one 30s window: compute the log-mel once and
+                # decode it directly, skipping transcribe()'s sliding-window loop
+                mel = whisper.log_mel_spectrogram(
+                    whisper.pad_or_trim(audio), n_mels=self.whisper_model.dims.n_mels
+                ).to(self.whisper_model.device)
+                options = whisper.DecodingOptions(
+                    language="en",
+                    without_timestamps=True,
+                    fp16=self.whisper_model.device.type != "cpu"
+                )
+                return whisper.decode(self.whisper_model, mel, options).text.strip()
+
+            result = self.whisper_model.transcribe(audio, language="en")
             return result["text"].strip()
         except Exception as e:
             print(f"Error transcribing with Whisper: {e}")
             return None
 
-    def transcribe_google(self, audio_file: str) -> Optional[str]:
+    @staticmethod
+    def _resample(audio: "np.ndarray", orig_rate: int, target_rate: int) -> "np.ndarray":
+        """
+        Resample audio in-process (polyphase filter via scipy when available).
+
+        Args:
+            audio: Mono float32 samples
+            orig_rate: Sample rate of the audio
+            target_rate: Desired sample rate
+
+        Returns:
+            Resampled float32 samples
+        """
+        try:
+            from scipy.signal import resample_poly
+
+            factor = gcd(orig_rate, target_rate)
+            resampled = resample_poly(audio, target_rate // factor, orig_rate // factor)
+        except ImportError:
+            # Linear interpolation - fine for speech if scipy is missing
+            n_out = int(round(len(audio) * target_rate / orig_rate))
+            resampled = np.interp(
+                np.linspace(0, len(audio) - 1, n_out), np.arange(len(audio)), audio
+            )
+        return resampled.astype(np.float32)
+
+    def _trim_to_speech(self, audio: "np.ndarray", sample_rate: int) -> Optional["np.ndarray"]:
+        """
+        Crop a recording to the span containing speech.
+
+        Args:
+            audio: Mono int16 samples
+            sample_rate: Sample rate of the audio
+
+        Returns:
+            The cropped samples, or None if no speech was detected
+        """
+        if self.vad_model is None or sample_rate % 8000:
+            return audio
+
+        try:
+            speech = self._get_speech_timestamps(
+                audio.astype(np.float32) / 32768.0,
+                self.vad_model,
+                sampling_rate=sample_rate,
+                threshold=0.5
+            )
+        except Exception as e:
+            print(f"VAD error (transcribing full recording): {e}")
+            return audio
+
+        if not speech:
+            return None
+        return audio[speech[0]["start"]:speech[-1]["end"]]
+
+    def transcribe_google(self, audio: "np.ndarray", sample_rate: int) -> Optional[str]:
         """
         Transcribe audio using Google Speech Recognition.
 
         Args:
-            audio_file: Path to audio file
+            audio: Mono int16 samples
+            sample_rate: Sample rate of the audio
 
         Returns:
             Transcribed text or None if transcription failed
         """
         try:
-            import speech_recognition as sr
-
-            # Load audio file
-            with sr.AudioFile(audio_file) as source:
-                audio = self.recognizer.record(source)
+            # The recording is already 16-bit PCM
+            audio_data = sr.AudioData(audio.tobytes(), sample_rate, 2)
 
             # Recognize speech
-            text = self.recognizer.recognize_google(audio)
+            text = self.recognizer.recognize_google(audio_data)
             return text.strip()
 
         except sr.UnknownValueError:
@@ -197,26 +479,25 @@ class SpeechToTextClient:
             return None
 
         # Record audio
-        audio_file = self.record_audio(duration)
-        if not audio_file:
+        recording = self.record_audio(duration)
+        if recording is None:
+            return None
+        audio, sample_rate = recording
+
+        # Don't run the recognizer on silence, and only on the spoken part
+        audio = self._trim_to_speech(audio, sample_rate)
+        if audio is None:
+            print("No speech detected")
             return None
 
         # Transcribe based on backend
         try:
             if self.backend == "whisper":
-                text = self.transcribe_whisper(audio_file)
+                return self.transcribe_whisper(audio, sample_rate)
             elif self.backend == "google":
-                text = self.transcribe_google(audio_file)
+                return self.transcribe_google(audio, sample_rate)
             else:
-                text = None
-
-            # Clean up temporary file
-            try:
-                os.unlink(audio_file)
-            except:
-                pass
-
-            return text
+                return None
 
         except Exception as e:
             print(f"Error during transcription: {e}")
@@ -4,13 +4,41 @@ High-quality AI voices with natural, expressive speech.
 """
 
 import os
+import time
+import atexit
+import shutil
+import hashlib
+import platform
 import tempfile
-from typing import Optional
+import subprocess
+from concurrent.futures import Executor
+from typing import Iterable, Iterator, Optional
 from dotenv import load_dotenv
 
+# Optional in-process MP3 player; external players are used without it
+try:
+    from easyaudiostream import play_stream as play_stream_in_process
+except ImportError:
+    play_stream_in_process = None
+
 # Load environment variables
 load_dotenv()
 
+# Murf endpoint that returns audio progressively while it is synthesized
+MURF_STREAM_URL = "https://api.murf.ai/v1/speech/stream"
+
+# Generated speech is kept on disk keyed by text and voice settings, so
+# repeated lines (welcome, goodbye, common replies) skip Murf entirely
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", os.path.join(tempfile.gettempdir(), "conch_tts"))
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_MB", "100")) * 1024 * 1024
+
+# A <id>.pending file next to a cache entry means some process is
+# synthesizing it; older markers are left over from a crashed worker
+PENDING_STALE_SECONDS = 180  # Murf timeout plus the download
+
+# Markdown characters dropped from text before synthesis
+_MARKDOWN_TABLE = str.maketrans("", "", "*_`")
+
 
 class ConchTTSClient:
     """Client for generating speech from text using Murf API."""
@@ -22,6 +50,7 @@ class ConchTTSClient:
         self.voice_id = os.getenv("MURF_VOICE_ID", "Ryan")
         self.style = os.getenv("MURF_STYLE", "Conversational")
         self.model = os.getenv("MURF_MODEL", "Falcon")
+        self.cache_dir = TTS_CACHE_DIR
 
         if self.enabled:
             if not self.api_key:
@@ -30,6 +59,32 @@ class ConchTTSClient:
             else:
                 print(f"✓ TTS enabled - using Murf voice: {self.voice_id} ({self.style})")
 
+        # One pooled HTTP client for every Murf call and audio download, so
+        # connections (and their TLS handshakes) are reused between replies
+        self.http_client = None
+        self.murf_client = None
+        if self.enabled:
+            try:
+                from murf import Murf
+                import httpx
+
+                # TTS can take 30-60 seconds for longer texts
+                client_options = dict(
+                    timeout=httpx.Timeout(120.0, connect=10.0),
+                    limits=httpx.Limits(max_keepalive_connections=8)
+                )
+                try:
+                    # HTTP/2 keeps one multiplexed api.murf.ai connection that
+                    # later replies reuse (needs the h2 package)
+                    self.http_client = httpx.Client(http2=True, **client_options)
+                except ImportError:
+                    self.http_client = httpx.Client(**client_options)
+                atexit.register(self.http_client.close)
+                self.murf_client = Murf(api_key=self.api_key, httpx_client=self.http_client)
+            except Exception as e:
+                print(f"❌ Could not initialize Murf client: {e}")
+                self.enabled = False
+
     def _clean_text_for_tts(self, text: str) -> str:
         """
         Clean text for better TTS output.
@@ -41,7 +96,7 @@ class ConchTTSClient:
             Cleaned text suitable for TTS
         """
         # Remove markdown/formatting
-        cleaned = text.replace("*", "").replace("_", "").replace("`", "")
+        cleaned = text.translate(_MARKDOWN_TABLE)
 
         # Remove ellipses at start/end only (not in the middle)
         cleaned = cleaned.strip()
@@ -66,31 +121,25 @@ class ConchTTSClient:
             text: Text to synthesize
 
         Returns:
-            Path to generated audio file or None
+            Path to the cached audio file (don't delete it) or None
         """
         if not self.enabled:
             return None
 
         try:
-            from murf import Murf
-            import requests
-            import httpx
-
             # Clean the text
             clean_text = self._clean_text_for_tts(text)
 
             if not clean_text:
                 return None
 
-            # Create httpx client with extended timeout for TTS generation
-            # TTS can take 30-60 seconds for longer texts
-            http_client = httpx.Client(timeout=httpx.Timeout(120.0, connect=10.0))
-
-            # Initialize Murf client with custom timeout
-            client = Murf(api_key=self.api_key, httpx_client=http_client)
+            # Reuse previously generated audio for the same line and voice
+            output_path = self._cache_path(clean_text)
+            if self._touch(output_path):
+                return output_path
 
             # Generate speech with Murf API
-            response = client.text_to_speech.generate(
+            response = self.murf_client.text_to_speech.generate(
                 text=clean_text,
                 voice_id=self.voice_id,
                 format="MP3",
@@ -100,22 +149,22 @@ class ConchTTSClient:
             # audio_file is a URL, download it
             audio_url = response.audio_file
 
-            # Download the audio file
-            audio_response = requests.get(audio_url, timeout=60)
-            audio_response.raise_for_status()
-
-            # Create temporary file for audio
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".mp3")
-            output_path = temp_file.name
-
-            # Write audio data to file
-            with open(output_path, 'wb') as f:
-                f.write(audio_response.content)
-
-            temp_file.close()
-
-            # Clean up httpx client
-            http_client.close()
+            # Stream the download to a temp name and rename, so the MP3 is
+            # never held in memory and concurrent readers never see a
+            # partially written cache entry
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix=".tmp", delete=False) as temp_file:
+                try:
+                    with self.http_client.stream("GET", audio_url, timeout=60) as audio_response:
+                        audio_response.raise_for_status()
+                        for chunk in audio_response.iter_bytes(65536):
+                            temp_file.write(chunk)
+                except Exception:
+                    temp_file.close()
+                    os.unlink(temp_file.name)
+                    raise
+            os.replace(temp_file.name, output_path)
+            self._trim_cache()
 
             return output_path
 
@@ -127,25 +176,234 @@ class ConchTTSClient:
             else:
                 print(f"⚠️  TTS error: {error_msg}")
 
-            # Clean up httpx client if it exists
+            return None
+
+    def start_speech(self, text: str, executor: Executor) -> Optional[str]:
+        """
+        Start synthesizing text in the background unless it is already cached.
+
+        The returned ID names the cache file, so every worker process can
+        serve it (see wait_for_speech). A marker file records synthesis in
+        flight, so workers don't request the same line from Murf twice.
+
+        Args:
+            text: Text to synthesize
+            executor: Executor that runs the Murf call
+
+        Returns:
+            Audio ID of the line, or None if there is nothing to say
+        """
+        audio_id = self.speech_id(text) if self.enabled else None
+        if audio_id is None or self._touch(self.speech_path(audio_id)):
+            return audio_id
+
+        pending_path = self._pending_path(audio_id)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        try:
+            os.close(os.open(pending_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        except FileExistsError:
             try:
-                http_client.close()
-            except:
+                if time.time() - os.path.getmtime(pending_path) < PENDING_STALE_SECONDS:
+                    return audio_id  # another worker is on it
+            except FileNotFoundError:
+                return audio_id  # it just finished
+            os.utime(pending_path)  # take over a stale marker
+
+        executor.submit(self._generate_pending, text, pending_path)
+        return audio_id
+
+    def _generate_pending(self, text: str, pending_path: str):
+        """Generate speech claimed by start_speech, then clear its marker."""
+        try:
+            self.generate_speech(text)
+        finally:
+            try:
+                os.unlink(pending_path)
+            except FileNotFoundError:
                 pass
 
+    def wait_for_speech(self, audio_id: str, timeout: float) -> Optional[str]:
+        """
+        Get the cached audio for an ID, waiting while it is being synthesized.
+
+        Args:
+            audio_id: ID returned by start_speech
+            timeout: Longest time to wait, in seconds
+
+        Returns:
+            Path to the audio file, or None if it doesn't exist (or failed)
+        """
+        output_path = self.speech_path(audio_id)
+        pending_path = self._pending_path(audio_id)
+        deadline = time.monotonic() + timeout
+        while not self._touch(output_path):
+            if not os.path.exists(pending_path):
+                # The file is written before the marker is removed
+                return output_path if self._touch(output_path) else None
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.1)
+        return output_path
+
+    def speech_id(self, text: str) -> Optional[str]:
+        """
+        Get the ID of a line of speech (the name of its cache file).
+
+        Args:
+            text: Text to synthesize
+
+        Returns:
+            Audio ID, or None if the text has nothing to say
+        """
+        clean_text = self._clean_text_for_tts(text)
+        if not clean_text:
             return None
+        return os.path.basename(self._cache_path(clean_text))[:-4]
+
+    def speech_path(self, audio_id: str) -> str:
+        """Get the cache file path for an audio ID (which may not exist yet)."""
+        return os.path.join(self.cache_dir, f"{audio_id}.mp3")
+
+    @staticmethod
+    def _touch(path: str) -> bool:
+        """Mark a cache file as recently used (for _trim_cache); False if it doesn't exist."""
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _pending_path(self, audio_id: str) -> str:
+        """Get the path of the marker for audio being synthesized."""
+        return os.path.join(self.cache_dir, f"{audio_id}.pending")
+
+    def _cache_path(self, clean_text: str) -> str:
+        """
+        Get the cache file path for a line of speech.
+
+        Args:
+            clean_text: Text as sent to Murf
+
+        Returns:
+            Path of the cached MP3 (which may not exist yet)
+        """
+        key = f"{clean_text}|{self.voice_id}|{self.style}|{self.model}"
+        digest = hashlib.sha256(key.encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.mp3")
+
+    def _trim_cache(self):
+        """Delete least recently used cache files once the cache outgrows its budget."""
+        try:
+            files = [(entry.stat(), entry.path) for entry in os.scandir(self.cache_dir)
+                     if entry.name.endswith(".mp3")]
+            total = sum(st.st_size for st, _ in files)
+            for st, path in sorted(files, key=lambda f: f[0].st_mtime):
+                if total <= TTS_CACHE_MAX_BYTES:
+                    break
+                os.unlink(path)
+                total -= st.st_size
+        except OSError as e:
+            print(f"⚠️  TTS cache cleanup error: {e}")
+
+    def stream_speech(self, text: str) -> Iterator[bytes]:
+        """
+        Stream speech from Murf API as it is synthesized.
+
+        Args:
+            text: Text to synthesize
+
+        Yields:
+            Chunks of MP3 audio data, as soon as Murf sends them
+        """
+        if not self.enabled:
+            return
+
+        clean_text = self._clean_text_for_tts(text)
+        if not clean_text:
+            return
+
+        try:
+            payload = {
+                "voiceId": self.voice_id,
+                "style": self.style,
+                "text": clean_text,
+                "format": "MP3",
+                "sampleRate": 44100
+            }
+            with self.http_client.stream(
+                "POST",
+                MURF_STREAM_URL,
+                json=payload,
+                headers={"api-key": self.api_key}
+            ) as response:
+                response.raise_for_status()
+                yield from response.iter_bytes(16384)
+
+        except Exception as e:
+            error_msg = str(e)
+            if "timeout" in error_msg.lower():
+                print(f"⏱️  TTS streaming timed out (API may be slow, continuing without voice...)")
+            else:
+                print(f"⚠️  TTS error: {error_msg}")
+
+    def play_stream(self, chunks: Iterable[bytes]):
+        """
+        Play MP3 audio while it is still being received.
+
+        Decodes and plays in-process with easyaudiostream when installed.
+        Otherwise, on Linux the chunks are piped straight into mpg123/ffplay;
+        other systems' players can't read from stdin, so the audio is
+        collected into a temporary file and played with play_audio.
+
+        Args:
+            chunks: Iterable of MP3 data chunks (e.g. from stream_speech)
+        """
+        try:
+            if play_stream_in_process is not None:
+                play_stream_in_process(chunks)
+                return
+
+            if platform.system() == "Linux":
+                for command in (["mpg123", "-q", "-"],
+                                ["ffplay", "-nodisp", "-autoexit", "-loglevel", "quiet", "pipe:0"]):
+                    if not shutil.which(command[0]):
+                        continue
+                    player = subprocess.Popen(command, stdin=subprocess.PIPE, stderr=subprocess.DEVNULL)
+                    try:
+                        for chunk in chunks:
+                            player.stdin.write(chunk)
+                    except BrokenPipeError:
+                        pass
+                    finally:
+                        try:
+                            player.stdin.close()
+                        except BrokenPipeError:
+                            pass
+                        player.wait()
+                    return
+
+            # No streaming-capable player - buffer to a file instead
+            audio_data = b"".join(chunks)
+            if not audio_data:
+                return
+            with tempfile.NamedTemporaryFile(delete=False, suffix=".mp3") as temp_file:
+                temp_file.write(audio_data)
+            self.play_audio(temp_file.name)
+
+        except Exception as e:
+            print(f"🔇 Audio playback error: {str(e)}")
 
     def play_audio(self, audio_path: str):
         """
         Play audio file through the system's default audio device.
 
+        Temporary files are deleted afterwards; cached speech is kept.
+
         Args:
             audio_path: Path to audio file
         """
+        keep = os.path.dirname(os.path.abspath(audio_path)) == os.path.abspath(self.cache_dir)
         try:
-            import subprocess
-            import platform
-
             # Use system player for reliable playback
             system = platform.system()
 
@@ -161,19 +419,21 @@ class ConchTTSClient:
                 subprocess.run(["powershell", "-c", f"(New-Object Media.SoundPlayer '{audio_path}').PlaySync()"], check=True)
 
             # Clean up temp file
-            try:
-                os.unlink(audio_path)
-            except:
-                pass
+            if not keep:
+                try:
+                    os.unlink(audio_path)
+                except:
+                    pass
 
         except Exception as e:
             # Simplified error message without traceback
             print(f"🔇 Audio playback error: {str(e)}")
             # Try cleanup anyway
-            try:
-                os.unlink(audio_path)
-            except:
-                pass
+            if not keep:
+                try:
+                    os.unlink(audio_path)
+                except:
+                    pass
 
     def speak(self, text: str) -> bool:
         """
@@ -188,12 +448,17 @@ class ConchTTSClient:
         if not self.enabled:
             return False
 
-        audio_path = self.generate_speech(text)
-        if not audio_path:
-            return False
-
-        self.play_audio(audio_path)
-        return True
+        # Stream Murf's response straight into the player - nothing is
+        # written to disk unless no streaming-capable player is available
+        received = False
+        def chunks():
+            nonlocal received
+            for chunk in self.stream_speech(text):
+                received = True
+                yield chunk
+
+        self.play_stream(chunks())
+        return received
 
 
 # Test function
@@ -3,25 +3,67 @@ The Conch Web Application
 Flask backend serving the conch chat experience with Murf TTS
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, make_response
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import re
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Add parent directory to path to import existing modules
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from llm_client import HorrorLLMClient
-from conch_character import conch
+from conch_character import conch, clean_response, EXIT_WORDS
 from tts_client import ConchTTSClient
 
 app = Flask(__name__)
 CORS(app)
 
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson (faster, emits raw UTF-8)."""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# jsonify() and request.get_json() both go through app.json
+if orjson is not None:
+    app.json = OrjsonProvider(app)
+
 # Initialize clients
 llm_client = None
 tts_client = None
-welcome_audio_cache = None  # Cache for welcome message audio
+
+# Audio IDs name files in the TTS disk cache (a sha256 of the text and
+# voice), so any worker process can serve audio another one generated
+_AUDIO_ID_RE = re.compile(r'[0-9a-f]{64}')
+
+# Murf calls run here while the text reply goes straight back to the browser
+_tts_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='conch-tts')
+TTS_WAIT_TIMEOUT = 130  # Murf client timeout is 120s
+
+# Behind nginx, let the proxy send audio files itself (sendfile, no copy
+# through Python). The location must be internal and alias TTS_CACHE_DIR:
+#   location /_protected_audio/ { internal; alias /tmp/conch_tts/; }
+USE_X_ACCEL = os.getenv('USE_X_ACCEL', 'false').lower() == 'true'
+X_ACCEL_PREFIX = os.getenv('X_ACCEL_PREFIX', '/_protected_audio/')
+
+
+def queue_speech(text: str):
+    """Start synthesizing text in the background and return its audio URL."""
+    audio_id = tts_client.start_speech(text, _tts_executor)
+    return f"/api/audio/{audio_id}" if audio_id else None
 
 def init_llm():
     """Initialize the LLM client."""
@@ -40,6 +82,8 @@ def init_tts():
         tts_client = ConchTTSClient()
         if tts_client.enabled:
             print(f"✓ Murf TTS enabled - Voice: {tts_client.voice_id} ({tts_client.style})")
+            # Synthesize the fixed lines at boot (queued, so startup isn't blocked)
+            precompute_speech()
         else:
             print("ℹ Murf TTS disabled (set TTS_ENABLED=true in .env to enable)")
     except Exception as e:
@@ -47,6 +91,15 @@ def init_tts():
         tts_client = None
 
 
+def precompute_speech():
+    """Fill the TTS disk cache with the welcome and goodbye messages."""
+    for text in (conch.get_welcome_message(), conch.get_goodbye_message()):
+        try:
+            tts_client.start_speech(text, _tts_executor)
+        except Exception as e:
+            print(f"TTS pre-generation error: {e}")
+
+
 @app.route('/')
 def index():
     """Serve the main chat interface."""
@@ -56,32 +109,14 @@ def index():
 @app.route('/api/welcome', methods=['GET'])
 def get_welcome():
     """Get the welcome message with audio."""
-    global welcome_audio_cache
-
     welcome_message = conch.get_welcome_message()
 
-    # Use cached audio URL if available
-    if welcome_audio_cache:
-        return jsonify({
-            'message': welcome_message,
-            'audio_url': welcome_audio_cache,
-            'success': True
-        })
-
-    # Generate audio for welcome message if TTS is enabled (first time only)
+    # Generate audio for welcome message if TTS is enabled (pre-generated
+    # at boot, so this normally comes straight from the TTS disk cache)
     audio_url = None
     if tts_client and tts_client.enabled:
         try:
-            audio_path = tts_client.generate_speech(welcome_message)
-            if audio_path:
-                # Store audio path with unique ID
-                import uuid
-                audio_id = str(uuid.uuid4())
-                app.config.setdefault('audio_cache', {})[audio_id] = audio_path
-                audio_url = f"/api/audio/{audio_id}"
-                # Cache the welcome audio URL for future requests
-                welcome_audio_cache = audio_url
-                print(f"✓ Welcome message audio cached: {audio_id}")
+            audio_url = queue_speech(welcome_message)
         except Exception as e:
             print(f"TTS generation error for welcome message: {e}")
 
@@ -106,9 +141,15 @@ def chat():
             }), 400
 
         # Check for exit commands
-        if user_message.lower() in ['exit', 'quit', 'bye', 'goodbye']:
+        if user_message.lower() in EXIT_WORDS:
+            goodbye_message = conch.get_goodbye_message()
+            audio_url = None
+            if tts_client and tts_client.enabled:
+                # Pre-generated at boot, so this is a disk cache hit
+                audio_url = queue_speech(goodbye_message)
             return jsonify({
-                'message': conch.get_goodbye_message(),
+                'message': goodbye_message,
+                'audio_url': audio_url,
                 'is_goodbye': True,
                 'success': True
             })
@@ -125,17 +166,12 @@ def chat():
         # Clean the response (remove asterisks, ellipses, etc.)
         response = clean_response(response)
 
-        # Generate audio if TTS is enabled
+        # Synthesize audio in the background; the browser fetches
+        # audio_url, which waits for Murf, while the text shows immediately
         audio_url = None
         if tts_client and tts_client.enabled:
             try:
-                audio_path = tts_client.generate_speech(response)
-                if audio_path:
-                    # Store audio path with unique ID
-                    import uuid
-                    audio_id = str(uuid.uuid4())
-                    app.config.setdefault('audio_cache', {})[audio_id] = audio_path
-                    audio_url = f"/api/audio/{audio_id}"
+                audio_url = queue_speech(response)
             except Exception as e:
                 print(f"TTS generation error: {e}")
 
@@ -157,11 +193,19 @@ def chat():
 def get_audio(audio_id):
     """Serve generated audio file."""
     try:
-        audio_cache = app.config.get('audio_cache', {})
-        audio_path = audio_cache.get(audio_id)
-
-        if audio_path and os.path.exists(audio_path):
-            return send_file(audio_path, mimetype='audio/mpeg')
+        audio_path = None
+        if tts_client and _AUDIO_ID_RE.fullmatch(audio_id):
+            # Waits while this or another worker is still synthesizing it
+            audio_path = tts_client.wait_for_speech(audio_id, TTS_WAIT_TIMEOUT)
+
+        if audio_path:
+            if USE_X_ACCEL:
+                resp = make_response('')
+                resp.headers['X-Accel-Redirect'] = X_ACCEL_PREFIX + os.path.basename(audio_path)
+                resp.headers['Content-Type'] = 'audio/mpeg'
+                return resp
+            # Conditional responses allow 304s and range requests
+            return send_file(audio_path, mimetype='audio/mpeg', conditional=True, etag=True)
         else:
             return jsonify({'error': 'Audio not found'}), 404
 
@@ -170,43 +214,6 @@ def get_audio(audio_id):
         return jsonify({'error': str(e)}), 500
 
 
-def clean_response(response: str) -> str:
-    """
-    Clean the LLM response to enforce formatting rules.
-
-    Args:
-        response: Raw response from LLM
-
-    Returns:
-        Cleaned response
-    """
-    import re
-
-    # Remove anything between asterisks (stage directions)
-    response = re.sub(r'\*[^*]+\*', '', response)
-
-    # Remove standalone asterisks
-    response = response.replace('*', '')
-
-    # Remove ellipses
-    response = response.replace('...', '')
-
-    # Clean up whitespace
-    response = ' '.join(response.split())
-    response = response.strip()
-
-    # Limit to first 3 sentences maximum
-    sentences = re.split(r'(?<=[.!?])\s+', response)
-    if len(sentences) > 3:
-        response = ' '.join(sentences[:3])
-
-    # If still no ending punctuation, add period
-    if response and response[-1] not in '.!?':
-        response += '.'
-
-    return response
-
-
 # Initialize clients when module is imported (for Vercel)
 init_llm()
 init_tts()
@@ -217,4 +224,6 @@ if __name__ == '__main__':
     print("Starting server...")
     print("Open http://localhost:8080 in your browser\n")
 
-    app.run(debug=True, host='0.0.0.0', port=8080)
+    # Development server only - set FLASK_DEBUG=1 for the reloader and
+    # debugger; run_web.sh uses gunicorn (see gunicorn.conf.py) when installed
+    app.run(host='0.0.0.0', port=8080)
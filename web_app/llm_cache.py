@@ -0,0 +1,164 @@
+"""
+Persistent response cache for The Conch's LLM client.
+Stores generated responses in a local SQLite file so they survive restarts.
+"""
+
+import os
+import time
+import sqlite3
+import threading
+from functools import lru_cache
+from typing import Optional
+
+
+class SQLiteCache:
+    """Key/value cache of LLM responses in SQLite, with entries expiring after a TTL."""
+
+    def __init__(self, path: str, ttl_days: float = 30):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: Path of the SQLite file
+            ttl_days: How long an entry stays valid, in days
+        """
+        self.path = path
+        self.ttl = ttl_days * 86400
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS cache(k TEXT PRIMARY KEY, v TEXT, model TEXT, ts REAL)"
+        )
+        # Drop expired entries so the file doesn't grow forever
+        conn.execute("DELETE FROM cache WHERE ts <= ?", (time.time() - self.ttl,))
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this process's connection (reopened after a fork)."""
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            # WAL lets readers in other worker processes proceed during writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._pid = os.getpid()
+        return self._conn
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached response, or None if missing or expired
+        """
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT v FROM cache WHERE k = ? AND ts > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, value: str, model: str = ""):
+        """
+        Store a response.
+
+        Args:
+            key: Cache key
+            value: Response text
+            model: Model that produced the response (kept for inspection)
+        """
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO cache(k, v, model, ts) VALUES (?, ?, ?, ?)",
+                (key, value, model, time.time())
+            )
+            conn.commit()
+
+
+class SemanticCache:
+    """
+    In-memory cache matching paraphrased questions by embedding similarity.
+
+    Uses a small sentence-transformers model; normalized embeddings are kept
+    in one float32 matrix per scope (backend/model/system prompt) so a lookup
+    is a single matrix-vector product.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        threshold: float = 0.92,
+        max_entries: int = 2048
+    ):
+        """
+        Load the embedding model.
+
+        Args:
+            model_name: sentence-transformers model used to embed questions
+            threshold: Minimum cosine similarity that counts as a hit
+            max_entries: Entries kept per scope (oldest dropped first)
+        """
+        from sentence_transformers import SentenceTransformer
+        import numpy as np
+
+        self._np = np
+        self.model = SentenceTransformer(model_name)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._scopes = {}  # scope -> (embeddings matrix, responses list)
+        # A miss in get() is followed by set() for the same question once the
+        # backend answers; remember recent vectors so it isn't encoded twice
+        self._embed = lru_cache(maxsize=64)(self._encode)
+
+    def _encode(self, text: str):
+        """Embed a question as a unit-length float32 vector (read-only, it is memoized)."""
+        vector = self.model.encode(text, normalize_embeddings=True).astype(self._np.float32)
+        vector.setflags(write=False)
+        return vector
+
+    def get(self, scope: str, question: str) -> Optional[str]:
+        """
+        Find the response to the most similar earlier question.
+
+        Args:
+            scope: Cache scope (responses only match within a scope)
+            question: The user's message
+
+        Returns:
+            The cached response, or None if nothing is similar enough
+        """
+        with self._lock:
+            entry = self._scopes.get(scope)
+        if entry is None:
+            return None
+        embeddings, responses = entry
+        scores = embeddings @ self._embed(question)
+        best = int(scores.argmax())
+        return responses[best] if scores[best] >= self.threshold else None
+
+    def set(self, scope: str, question: str, response: str):
+        """
+        Remember a response for a question.
+
+        Args:
+            scope: Cache scope
+            question: The user's message
+            response: Response text
+        """
+        vector = self._embed(question)[None, :]
+        with self._lock:
+            entry = self._scopes.get(scope)
+            if entry is None:
+                embeddings, responses = vector, [response]
+            else:
+                embeddings = self._np.vstack((entry[0][-(self.max_entries - 1):], vector))
+                responses = entry[1][-(self.max_entries - 1):] + [response]
+            # Replace rather than mutate, so concurrent readers see a consistent pair
+            self._scopes[scope] = (embeddings, responses)
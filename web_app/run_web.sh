@@ -18,5 +18,10 @@ if [ ! -f ../.env ]; then
     echo ""
 fi
 
-# Run the Flask app
-python3 app.py
+# Run under gunicorn (gevent workers) when available, so users waiting on
+# the LLM or voice generation don't block each other
+if command -v gunicorn > /dev/null 2>&1; then
+    gunicorn -c ../gunicorn.conf.py app:app
+else
+    python3 app.py
+fi